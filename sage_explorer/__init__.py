@@ -6,7 +6,8 @@
 # import sage
 # monkey_patch(sage_explorer.misc, sage.misc, log_level=logging.INFO)
 
-from .sage_explorer import SageExplorer, SageExplorer as explore
+from .sage_explorer import SageExplorer, explore
+from ._cache import cache_stats
 try:
     import _widgets
 except:
@@ -0,0 +1,752 @@
+# -*- coding: utf-8 -*-
+r"""
+Persistent caches for Sage Explorer
+
+Most of the data displayed on an explorer page (member index of a class,
+property values of an object, rendered docstrings) only depends on the
+object and on the Sage build. It is kept in caches that persist on disk,
+one pickle file per entry, under a directory specific to the Sage version.
+
+Values computed for objects seen during the session are also kept in
+memory, in bounded caches keyed by the objects themselves.
+
+All in-memory caches of the process belong to one registry, shared by all
+explorers, which keeps their total estimated size within one memory budget
+by evicting the least recently used entries, whatever their cache.
+:func:`cache_stats` reports their hits, misses, sizes and evictions.
+
+On hosts running many kernels, rendered docs, member indexes and argspecs
+can also be shared by all kernels through a SQLite database in WAL mode,
+given by the environment variable ``SAGE_EXPLORER_SHARED_CACHE``.
+"""
+import os, sys, time, json, hashlib, itertools, pickle, tempfile, weakref, threading, sqlite3, zlib
+from collections import OrderedDict
+
+try:
+    from sage.version import version as SAGE_VERSION
+except ImportError:
+    SAGE_VERSION = 'unknown'
+
+def cache_directory():
+    r"""
+    Return the root directory of the persistent caches.
+
+    This is the value of the environment variable ``SAGE_EXPLORER_CACHE``
+    if set, else ``sage_explorer`` within the Sage dot directory.
+
+    TESTS::
+        sage: from sage_explorer._cache import cache_directory
+        sage: cache_directory().endswith('sage_explorer')
+        True
+    """
+    if os.environ.get('SAGE_EXPLORER_CACHE'):
+        return os.environ['SAGE_EXPLORER_CACHE']
+    try:
+        from sage.env import DOT_SAGE
+    except ImportError:
+        DOT_SAGE = os.path.join(os.path.expanduser('~'), '.sage')
+    return os.path.join(DOT_SAGE, 'sage_explorer')
+
+def hash_key(key):
+    r"""
+    Return a hexadecimal digest for cache key `key`.
+
+    TESTS::
+        sage: from sage_explorer._cache import hash_key
+        sage: hash_key('conjugate')
+        '2b01b87fa85afbd6d72ecc75335dd703192944e3'
+        sage: len(hash_key(('sage.combinat.partition.Partition', 3)))
+        40
+    """
+    if not isinstance(key, bytes):
+        key = repr(key).encode('utf-8')
+    return hashlib.sha1(key).hexdigest()
+
+SCALAR_TYPES = (type(None), bool, int, float, complex, str, bytes) # Sized exactly by sys.getsizeof
+
+def estimate_size(value, sample=100, budget=2000):
+    r"""
+    Estimate the memory size of `value`, in bytes.
+
+    Containers (lists, tuples, dictionaries and sets) are followed
+    recursively, each object being counted once; of a container with more
+    than `sample` items, only `sample` items are measured, and the result
+    is scaled up. Other objects count for their pickle, if larger than
+    their own size. At most `budget` objects are measured in all.
+
+    TESTS::
+        sage: from sage_explorer._cache import estimate_size
+        sage: estimate_size([1, 2, 3]) > estimate_size([])
+        True
+        sage: big = [float(i) for i in range(10**6)]
+        sage: 3 * 10**7 < estimate_size((big, 0.1)) < 4 * 10**7
+        True
+        sage: estimate_size({'rows': [big[:1000]] * 2}) > 3 * 10**4
+        True
+        sage: estimate_size(matrix(RDF, 200, 200)) > 10**5
+        True
+    """
+    seen = set()
+    remaining = [budget]
+    def size_of(x):
+        if id(x) in seen:
+            return 0
+        seen.add(id(x))
+        size = sys.getsizeof(x, 64)
+        remaining[0] -= 1
+        if isinstance(x, SCALAR_TYPES) or remaining[0] <= 0:
+            return size
+        if isinstance(x, (list, tuple)):
+            n = len(x)
+            items = x[::n // sample] if n > sample else x
+        elif isinstance(x, dict):
+            n = 2 * len(x)
+            items = [y for item in itertools.islice(x.items(), sample // 2) for y in item]
+        elif isinstance(x, (set, frozenset)):
+            n = len(x)
+            items = list(itertools.islice(x, sample))
+        else:
+            try:
+                return max(size, len(pickle.dumps(x, protocol=2)))
+            except Exception:
+                return size
+        items_size = sum(size_of(y) for y in items)
+        if items and len(items) < n:
+            items_size = items_size * n // len(items)
+        return size + items_size
+    return size_of(value)
+
+class CacheRegistry(object):
+    r"""
+    The in-memory caches of the process, sharing a budget of `maxbytes`
+    estimated bytes: beyond it, the least recently used entries of all
+    caches are evicted first.
+
+    Caches register themselves at creation, by name, and are only
+    weakly referenced by the registry. Their entries are updated under
+    the lock of the registry, as they are shared with background threads.
+
+    TESTS::
+        sage: from sage_explorer._cache import CacheRegistry, ObjectCache
+        sage: registry = CacheRegistry(maxbytes=3000)
+        sage: c1 = ObjectCache('c1', registry=registry)
+        sage: c2 = ObjectCache('c2', registry=registry)
+        sage: p1, p2, p3 = Partition([2,1]), Partition([3]), Partition([1])
+        sage: c1.set(p1, 'a' * 1000); c2.set(p2, 'b' * 1000); c1.get(p1)
+        'aaa...'
+        sage: c2.set(p3, 'c' * 1000)
+        sage: c1.get(p1) is None, c2.get(p2) is None, c2.get(p3) is None
+        (False, True, False)
+        sage: registry.stats()['c2']
+        {'bytes': 1049, 'entries': 1, 'evictions': 1, 'hits': 1, 'misses': 1}
+    """
+    def __init__(self, maxbytes):
+        self.maxbytes = maxbytes
+        self.caches = weakref.WeakValueDictionary() # name -> cache
+        self.clock = 0 # Counts cache accesses, to order entries by last use across caches
+        self.lock = threading.RLock()
+
+    def register(self, cache):
+        self.caches[cache.name] = cache
+
+    def tick(self):
+        self.clock += 1
+        return self.clock
+
+    def size(self):
+        r"""
+        Return the total estimated size of the cached values, in bytes.
+        """
+        return sum(cache.size for cache in list(self.caches.values()))
+
+    def enforce(self):
+        r"""
+        Evict the least recently used entries until the total size fits the budget.
+        """
+        with self.lock:
+            size = self.size()
+            while size > self.maxbytes:
+                caches = [cache for cache in list(self.caches.values()) if cache.entries]
+                if not caches:
+                    break
+                size -= min(caches, key=lambda cache: cache.oldest()).evict()
+
+    def stats(self):
+        r"""
+        Return, for each cache name, the statistics of the cache.
+        """
+        return dict((name, cache.stats()) for name, cache in list(self.caches.items()))
+
+    def clear(self):
+        r"""
+        Empty the in-memory part of all caches.
+        """
+        for cache in list(self.caches.values()):
+            cache.clear()
+
+cache_registry = CacheRegistry(maxbytes=int(os.environ.get('SAGE_EXPLORER_CACHE_MEMORY', 256 << 20)))
+
+def encode_data(value):
+    r"""
+    Return `value` as JSON, if it is made of None, booleans, integers, floats
+    and strings, in lists, tuples and dictionaries with string keys;
+    else raise a TypeError.
+
+    TESTS::
+        sage: from sage_explorer._cache import encode_data, decode_data
+        sage: value = [('add_cell', 'method', 1, (), None, ['self', 'i', 'j'], (None,))]
+        sage: decode_data(encode_data(value)) == value
+        True
+        sage: encode_data((ZZ,))
+        Traceback (most recent call last):
+        ...
+        TypeError: Cannot encode Integer Ring as data
+    """
+    def encode(x):
+        if x is None or type(x) in (bool, int, float, str):
+            return x
+        if type(x) is list:
+            return [encode(y) for y in x]
+        if type(x) is tuple:
+            return {'tuple': [encode(y) for y in x]}
+        if type(x) is dict and all(type(k) is str for k in x):
+            return {'dict': dict((k, encode(y)) for k, y in x.items())}
+        raise TypeError("Cannot encode %s as data" % repr(x)[:80])
+    return json.dumps(encode(value))
+
+def decode_data(data):
+    r"""
+    Return the value encoded as JSON `data` by :func:`encode_data`.
+    """
+    def decode(x):
+        if type(x) is list:
+            return [decode(y) for y in x]
+        if type(x) is dict:
+            if 'tuple' in x:
+                return tuple(decode(y) for y in x['tuple'])
+            return dict((k, decode(y)) for k, y in x['dict'].items())
+        return x
+    return decode(json.loads(data))
+
+class SharedStore(object):
+    r"""
+    A store of cache entries shared by all kernels of a host:
+    a SQLite database `filename`, in WAL mode, so that readers never
+    wait for writers. Entries are keyed by Sage `version` too, so that
+    kernels of several Sage versions on one host do not share them.
+
+    Entries are stored as compressed JSON data (see :func:`encode_data`),
+    never as pickles: a user able to write to the database can spoil the
+    entries of other kernels, but not run code in them. Values which are
+    not plain data are not shared.
+
+    The store is only a help: when its database cannot be opened or is
+    busy for more than `timeout` seconds, lookups miss and writes are
+    dropped, and the in-process caches work alone; connecting is tried
+    again after `retry` seconds. Without `filename`, the store is disabled.
+
+    TESTS::
+        sage: from sage_explorer._cache import SharedStore
+        sage: store = SharedStore(tmp_filename(ext='.db'))
+        sage: store.get('docs', 'a') is None
+        True
+        sage: store.set('docs', 'a', '<p>a</p>')
+        True
+        sage: SharedStore(store.filename).get('docs', 'a')
+        '<p>a</p>'
+        sage: store.stats()
+        {'errors': 0, 'hit_rate': 0.0, 'hits': 0, 'misses': 1, 'writes': 1}
+        sage: store.set('argspecs', 'b', (['self', 'x'], (ZZ,)))
+        False
+        sage: SharedStore(store.filename, version='0.0').get('docs', 'a') is None
+        True
+        sage: store = SharedStore('/nonexistent/shared.db')
+        sage: store.get('docs', 'a') is None, store.stats()['errors']
+        (True, 1)
+    """
+    def __init__(self, filename=None, timeout=0.1, retry=60, version=SAGE_VERSION):
+        self.filename = filename
+        self.version = version
+        self.timeout = timeout
+        self.retry = retry
+        self.connection = None
+        self.retry_at = 0 # Time of the next connection attempt
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.writes = self.errors = 0
+
+    def connect(self):
+        r"""
+        Return a connection to the database, or None if it is unavailable.
+        """
+        if self.connection is not None or not self.filename or time.time() < self.retry_at:
+            return self.connection
+        try:
+            connection = sqlite3.connect(self.filename, timeout=self.timeout,
+                                         isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS versioned_entries (version TEXT, cache TEXT, key TEXT, '
+                               'value BLOB, PRIMARY KEY (version, cache, key)) WITHOUT ROWID')
+        except sqlite3.Error:
+            self.failed()
+            return
+        self.connection = connection
+        return connection
+
+    def failed(self):
+        r"""
+        Record an error, and stop using the database for a while.
+        """
+        self.errors += 1
+        self.retry_at = time.time() + self.retry
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except sqlite3.Error:
+                pass
+            self.connection = None
+
+    def get(self, cache, key):
+        r"""
+        Return the value stored for `key` in cache `cache`, or None.
+        """
+        if not self.filename:
+            return
+        with self.lock:
+            connection = self.connect()
+            if connection is None:
+                return
+            try:
+                row = connection.execute('SELECT value FROM versioned_entries '
+                                         'WHERE version = ? AND cache = ? AND key = ?',
+                                         (self.version, cache, hash_key(key))).fetchone()
+            except sqlite3.Error:
+                self.failed()
+                return
+        if row is None:
+            self.misses += 1
+            return
+        try:
+            value = decode_data(zlib.decompress(row[0]).decode('utf-8'))
+        except Exception: # Corrupted or outdated entry
+            self.misses += 1
+            return
+        self.hits += 1
+        return value
+
+    def set(self, cache, key, value):
+        r"""
+        Store `value` for `key` in cache `cache`. Return whether it could be stored.
+        """
+        if not self.filename:
+            return False
+        try:
+            data = zlib.compress(encode_data(value).encode('utf-8'))
+        except (TypeError, ValueError): # Not plain data
+            return False
+        with self.lock:
+            connection = self.connect()
+            if connection is None:
+                return False
+            try:
+                connection.execute('INSERT OR REPLACE INTO versioned_entries VALUES (?, ?, ?, ?)',
+                                   (self.version, cache, hash_key(key), sqlite3.Binary(data)))
+            except sqlite3.Error:
+                self.failed()
+                return False
+        self.writes += 1
+        return True
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'writes': self.writes, 'errors': self.errors,
+                'hit_rate': float(self.hits) / lookups if lookups else 0.0}
+
+shared_store = SharedStore(os.environ.get('SAGE_EXPLORER_SHARED_CACHE'))
+
+def cache_stats():
+    r"""
+    Return statistics on the in-memory caches of Sage Explorer:
+    for each cache name, a dictionary of its hits, misses, number of
+    entries, estimated size in bytes, and evictions; and, if the store
+    shared by all kernels is enabled, its hits, misses, hit rate, writes
+    and errors, as ``'shared'``.
+
+    The memory budget shared by all caches is given in bytes by the
+    environment variable ``SAGE_EXPLORER_CACHE_MEMORY``, 256 MB by default.
+
+    TESTS::
+        sage: from sage_explorer import cache_stats
+        sage: stats = cache_stats()
+        sage: sorted(stats['docs'])
+        ['bytes', 'entries', 'evictions', 'hits', 'misses']
+    """
+    stats = cache_registry.stats()
+    if shared_store.filename:
+        stats['shared'] = shared_store.stats()
+    return stats
+
+class MemoryCache(object):
+    r"""
+    Base class for the in-memory caches: entries ordered by last use,
+    with their estimated size, registered in `registry`.
+    """
+    def __init__(self, name, registry=None):
+        self.name = name
+        self.registry = registry or cache_registry
+        self.entries = OrderedDict() # key -> (value, size, tick, weak reference or None)
+        self.size = 0
+        self.hits = self.misses = self.evictions = 0
+        self.registry.register(self)
+
+    def lookup(self, key):
+        r"""
+        Return the entry for `key`, if any, marking it as most recently used.
+        """
+        with self.registry.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry = self.entries[key] = entry[:2] + (self.registry.tick(),) + entry[3:]
+                self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, value, ref=None):
+        r"""
+        Store entry (`key`, `value`), keeping the registry within its budget.
+        """
+        size = estimate_size(value)
+        with self.registry.lock:
+            self.remove(key)
+            self.entries[key] = (value, size, self.registry.tick(), ref)
+            self.size += size
+            self.registry.enforce()
+
+    def oldest(self):
+        r"""
+        Return the last use time of the least recently used entry.
+        """
+        return self.entries[next(iter(self.entries))][2]
+
+    def evict(self):
+        r"""
+        Remove the least recently used entry, and return its size.
+        """
+        with self.registry.lock:
+            key = next(iter(self.entries))
+            size = self.entries[key][1]
+            self.remove(key)
+            self.evictions += 1
+        return size
+
+    def remove(self, key):
+        with self.registry.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry[1]
+
+    def clear(self):
+        with self.registry.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries),
+                'bytes': self.size, 'evictions': self.evictions}
+
+class PersistentCache(MemoryCache):
+    r"""
+    A dictionary-like cache, kept in memory and persisted on disk.
+
+    Each entry is stored in its own file, written atomically, so that
+    several processes can fill the same cache concurrently.
+    Entries that cannot be pickled are only kept in memory.
+    Entries evicted from memory are read again from disk when needed.
+    If `shared`, entries are also looked up in, and written to, the
+    store shared by all kernels of the host, before the disk.
+
+    TESTS::
+        sage: from sage_explorer._cache import PersistentCache
+        sage: d = tmp_dir()
+        sage: c = PersistentCache('test', directory=d)
+        sage: c.get('a') is None
+        True
+        sage: c['a'] = [1, 2]
+        sage: PersistentCache('test', directory=d).get('a')
+        [1, 2]
+        sage: 'a' in c, 'b' in c
+        (True, False)
+    """
+    def __init__(self, name, directory=None, registry=None, shared=False):
+        super(PersistentCache, self).__init__(name, registry)
+        self.directory = directory
+        self.shared = shared
+
+    def path(self):
+        r"""
+        Return the directory where entries of this cache are stored.
+        """
+        return os.path.join(self.directory or cache_directory(), SAGE_VERSION, self.name)
+
+    def filename(self, key):
+        r"""
+        Return the file name where the entry for `key` is stored.
+        """
+        return os.path.join(self.path(), hash_key(key) + '.pickle')
+
+    def get(self, key, default=None):
+        r"""
+        Return the value cached for `key`, else `default`.
+        """
+        try:
+            entry = self.lookup(key)
+        except TypeError: # Unhashable key
+            self.misses += 1
+            return default
+        if entry is not None:
+            self.hits += 1
+            return entry[0]
+        value = shared_store.get(self.name, key) if self.shared else None
+        if value is None:
+            try:
+                with open(self.filename(key), 'rb') as f:
+                    value = pickle.load(f)
+            except Exception: # Missing, corrupted or outdated entry
+                self.misses += 1
+                return default
+            if self.shared:
+                shared_store.set(self.name, key, value)
+        self.hits += 1
+        self.put(key, value)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, self) is not self
+
+    def __getitem__(self, key):
+        value = self.get(key, self)
+        if value is self:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.put(key, value)
+        self.store(key, value)
+        if self.shared:
+            shared_store.set(self.name, key, value)
+
+    def store(self, key, value):
+        r"""
+        Write the entry (`key`, `value`) to disk.
+
+        Return whether it could be written.
+        """
+        try:
+            data = pickle.dumps(value, protocol=2)
+        except Exception:
+            return False
+        path = self.path()
+        try:
+            if not os.path.isdir(path):
+                os.makedirs(path)
+        except OSError:
+            if not os.path.isdir(path):
+                return False
+        try:
+            fd, tmpname = tempfile.mkstemp(dir=path, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.rename(tmpname, self.filename(key))
+        except (IOError, OSError):
+            return False
+        return True
+
+    def clear(self, persistent=False):
+        r"""
+        Empty the memory part of the cache, and its disk part if `persistent`.
+        """
+        super(PersistentCache, self).clear()
+        if not persistent:
+            return
+        path = self.path()
+        if not os.path.isdir(path):
+            return
+        for name in os.listdir(path):
+            try:
+                os.remove(os.path.join(path, name))
+            except OSError:
+                pass
+
+members_cache = PersistentCache('members', shared=True)
+properties_cache = PersistentCache('properties')
+docs_cache = PersistentCache('docs', shared=True)
+argspecs_cache = PersistentCache('argspecs', shared=True)
+
+def is_mutable(obj):
+    r"""
+    Test whether `obj` says it is mutable, as Sage matrices and graphs do.
+
+    TESTS::
+        sage: from sage_explorer._cache import is_mutable
+        sage: is_mutable(matrix([[1]])), is_mutable(Graph(2)), is_mutable(Graph(2, immutable=True))
+        (True, True, False)
+        sage: is_mutable(Partition([2,1]))
+        False
+    """
+    try:
+        return bool(obj.is_mutable())
+    except Exception:
+        pass
+    try:
+        return not obj.is_immutable()
+    except Exception:
+        return False
+
+class ObjectCache(MemoryCache):
+    r"""
+    A cache of values computed for objects, evicting the least recently
+    used entries beyond `maxsize` entries or `maxbytes` estimated bytes.
+
+    Objects are keyed weakly if they support weak references, so that
+    their entries go away with them, else by type and value if they
+    are hashable. Mutable objects are not cached.
+    Several values can be cached per object, under distinct hashable
+    `subkey` values.
+
+    TESTS::
+        sage: from sage_explorer._cache import ObjectCache
+        sage: c = ObjectCache('test', maxsize=2)
+        sage: p1, p2, p3 = Partition([2,1]), Partition([3]), Partition([1])
+        sage: c.set(p1, 'a'); c.set(p2, 'b'); c.get(p1)
+        'a'
+        sage: c.set(p3, 'c'); c.get(p2) is None, len(c)
+        (True, 2)
+        sage: c.set(int(5), 'd'); c.get(int(5)), c.get(float(5))
+        ('d', None)
+        sage: del p3
+        sage: len(c)
+        1
+
+    Nested values count for their whole size::
+
+        sage: c = ObjectCache('nested', maxbytes=1 << 20)
+        sage: c.set(p1, ({'rows': [[float(i) for i in range(1000)] for j in range(100)]}, 0.1))
+        sage: c.get(p1) is None
+        False
+        sage: c.set(p2, 'b'); c.get(p1) is None, len(c)
+        (True, 1)
+    """
+    def __init__(self, name, maxsize=256, maxbytes=64 << 20, registry=None):
+        super(ObjectCache, self).__init__(name, registry)
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+
+    def key(self, obj):
+        r"""
+        Return the key of `obj`, or None if it can be neither weakly referenced nor hashed.
+        """
+        if type(obj).__weakrefoffset__:
+            return ('id', id(obj))
+        try:
+            hash(obj)
+        except TypeError:
+            return
+        return ('value', type(obj), obj)
+
+    def forget(self, key):
+        r"""
+        Return a callback removing entry `key` when its object goes away.
+        """
+        selfref = weakref.ref(self)
+        def callback(ref):
+            cache = selfref()
+            if cache is not None:
+                entry = cache.entries.get(key)
+                if entry is not None and entry[3] is ref:
+                    cache.remove(key)
+        return callback
+
+    def get(self, obj, default=None, subkey=None):
+        r"""
+        Return the value cached for `obj` (and `subkey`), else `default`.
+        """
+        key = self.key(obj)
+        if key is None:
+            self.misses += 1
+            return default
+        key += (subkey,)
+        entry = self.lookup(key)
+        if entry is None or (entry[3] is not None and entry[3]() is not obj):
+            self.misses += 1
+            return default
+        self.hits += 1
+        return entry[0]
+
+    def set(self, obj, value, subkey=None):
+        r"""
+        Cache `value` for `obj` (and `subkey`), if possible.
+        """
+        if is_mutable(obj):
+            return
+        key = self.key(obj)
+        if key is None:
+            return
+        key += (subkey,)
+        ref = None
+        if key[0] == 'id':
+            ref = weakref.ref(obj, self.forget(key))
+        self.put(key, value, ref)
+        with self.registry.lock:
+            while len(self.entries) > self.maxsize or (self.size > self.maxbytes and len(self.entries) > 1):
+                self.evict()
+
+    def items(self, obj):
+        r"""
+        Return the list of pairs (subkey, value) cached for `obj`.
+
+        TESTS::
+            sage: from sage_explorer._cache import ObjectCache
+            sage: c = ObjectCache('test')
+            sage: p = Partition([2,1])
+            sage: c.set(p, 'a'); c.set(p, 'b', subkey=1); c.set(Partition([3]), 'c')
+            sage: sorted(c.items(p), key=str)
+            [(1, 'b'), (None, 'a')]
+        """
+        key = self.key(obj)
+        if key is None:
+            return []
+        with self.registry.lock:
+            return [(k[-1], entry[0]) for k, entry in self.entries.items()
+                    if k[:-1] == key and (entry[3] is None or entry[3]() is obj)]
+
+def arguments_key(args):
+    r"""
+    Return a hashable key for the list of arguments `args`, or None.
+
+    Arguments are keyed by type and value if they are hashable,
+    else by a digest of their pickle.
+
+    TESTS::
+        sage: from sage_explorer._cache import arguments_key
+        sage: arguments_key([1, 2]) == arguments_key([1, 2]), arguments_key([1, 2]) == arguments_key([1, 2/1])
+        (True, False)
+        sage: arguments_key([[1, 2]]) == arguments_key([[1, 2]])
+        True
+        sage: arguments_key([lambda x: x]) is None
+        True
+    """
+    key = tuple((type(arg), arg) for arg in args)
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        pass
+    try:
+        return ('pickle', hash_key(pickle.dumps(list(args), protocol=2)))
+    except Exception:
+        return
+
+property_cache = ObjectCache('property_values')
+result_cache = ObjectCache('results', maxsize=64, maxbytes=32 << 20)
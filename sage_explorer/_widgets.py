@@ -2,12 +2,19 @@
 Defining standard widgets for some Sage classes
 """
 
-import traitlets
-from ipywidgets import Box, HTML
+import os, pickle, operator, tempfile, threading, multiprocessing, traitlets, numpy
+from collections import deque
+from io import BytesIO
+from ipywidgets import Box, VBox, HBox, HTML, Label, IntSlider, FloatSlider, Image, ToggleButtons
+try:
+    from html import escape
+except ImportError: # Python 2
+    from cgi import escape
 from sage.misc.bindable_class import BindableClass
-from sage.all import SAGE_TMP, SageObject, Graphics, plot
+from sage.all import SAGE_TMP, SageObject, plot
 import sage.all
-from os.path import join as path_join
+from .sage_explorer import widget_bindings
+from ._cache import ObjectCache, hash_key
 
 # Workaround:
 # Tableau is lazy imported by default, and lazy import objects don't yet have a
@@ -21,9 +28,162 @@ class MetaHasTraitsClasscallMetaclass (traitlets.traitlets.MetaHasTraits, sage.m
 class BindableWidgetClass(BindableClass):
     pass
 
+PLOT_TIMEOUT = 120 # Time after which a plot is given up, its worker process being lost or stuck, in seconds
+PLOT_PLACEHOLDER = '<div class="resultinfo">Plotting...</div>'
+
+def plot_svg(obj, figsize=4):
+    r"""
+    Plot `obj` and return the plot as an svg document.
+
+    TESTS::
+        sage: from sage_explorer._widgets import plot_svg
+        sage: plot_svg(graphs.PetersenGraph())[:5]
+        '<?xml'
+    """
+    fd, filename = tempfile.mkstemp(suffix='.svg', dir=SAGE_TMP)
+    os.close(fd)
+    try:
+        plot(obj, figsize=figsize).save(filename)
+        with open(filename, 'rb') as f:
+            return f.read().decode('utf-8')
+    finally:
+        os.remove(filename)
+
+def render_plot(data, figsize):
+    r"""
+    Plot the pickled object `data`, in a worker process.
+
+    OUTPUT: a pair (svg document or None, error message or None)
+    """
+    try:
+        return plot_svg(pickle.loads(data), figsize), None
+    except Exception as e:
+        return None, "%s: %s" % (e.__class__.__name__, e)
+
+def init_worker():
+    r"""
+    Load Sage once in each worker process.
+    """
+    import sage.all
+
+class PlotPool(object):
+    r"""
+    Render the plots of :class:`PlotWidget` widgets in `processes` worker processes.
+
+    The number of processes is ``$SAGE_EXPLORER_PLOT_PROCESSES`` if set,
+    else the number of cores minus one; with 0, plots are rendered in
+    threads of the kernel. The pool is started on the first plot.
+
+    At most one plot per process is handed to the pool at a time, the
+    others wait in a queue: widgets closed meanwhile, for instance when
+    navigating away, are dropped from the queue without being rendered.
+    A plot which fails, or is not done after ``PLOT_TIMEOUT`` seconds
+    (when its worker process died, the pool never returns), frees its
+    place, and its widget shows an error.
+
+    TESTS::
+        sage: from sage_explorer._widgets import PlotPool
+        sage: pool = PlotPool(1)
+        sage: class Widget(object):
+        ....:     abandoned = False
+        ....:     data, figsize = b'not a pickle', 4
+        ....:     def finish(self, svg, error):
+        ....:         self.error = error
+        sage: w = Widget(); pool.submit(w); sleep(5)
+        sage: w.error, pool.running
+        ('UnpicklingError: ...', {})
+    """
+    def __init__(self, processes=None):
+        if processes is None:
+            processes = int(os.environ.get('SAGE_EXPLORER_PLOT_PROCESSES', max(1, multiprocessing.cpu_count() - 1)))
+        self.processes = processes
+        self.pool = None
+        self.queue = deque()
+        self.running = {} # Timers giving up the plots handed to the pool, by widget
+        self.lock = threading.Lock()
+
+    def start(self):
+        r"""
+        Start the worker processes.
+        """
+        self.pool = multiprocessing.Pool(self.processes, initializer=init_worker)
+
+    def submit(self, widget):
+        r"""
+        Queue the plot of `widget`, whose pickled object is ``widget.data``.
+        """
+        with self.lock:
+            self.queue.append(widget)
+            self.dispatch()
+
+    def dispatch(self):
+        r"""
+        Hand queued plots to idle processes. Call with the lock held.
+        """
+        while len(self.running) < self.processes and self.queue:
+            widget = self.queue.popleft()
+            if widget.abandoned:
+                continue
+            if self.pool is None:
+                self.start()
+            timer = threading.Timer(PLOT_TIMEOUT, self.done, (widget, (None, "Timeout after %ds" % PLOT_TIMEOUT)))
+            timer.daemon = True
+            self.running[widget] = timer
+            timer.start()
+            self.pool.apply_async(render_plot, (widget.data, widget.figsize),
+                                  callback=lambda result, widget=widget: self.done(widget, result),
+                                  error_callback=lambda e, widget=widget: self.done(
+                                      widget, (None, "%s: %s" % (e.__class__.__name__, e))))
+
+    def done(self, widget, result):
+        r"""
+        Pass the `result` of :func:`render_plot` to `widget`, unless it was
+        given up, and start the next plot.
+        """
+        with self.lock:
+            timer = self.running.pop(widget, None)
+            if timer is None: # Given up, or the pool was stopped
+                return
+            timer.cancel()
+            self.dispatch()
+        widget.finish(*result)
+
+    def stop(self):
+        r"""
+        Drop the queued plots and terminate the worker processes.
+        """
+        with self.lock:
+            self.queue.clear()
+            if self.pool is not None:
+                self.pool.terminate()
+            self.pool = None
+            for timer in self.running.values():
+                timer.cancel()
+            self.running = {}
+
+plot_pool = PlotPool()
+plots = ObjectCache('plots', maxsize=64, maxbytes=32 << 20) # Svg documents by object and figure size
+
 class PlotWidget(Box, BindableWidgetClass):
+    r"""
+    The plot of `obj`.
+
+    The plot is rendered by :data:`plot_pool`, and shows up in place of
+    a placeholder once done; closing the widget abandons it. Objects that
+    cannot be pickled are plotted in a thread of the kernel.
+
+    TESTS::
+        sage: from sage_explorer._widgets import PlotWidget
+        sage: w = PlotWidget(posets.BooleanLattice(3))
+        sage: w.wait(60)[:5]
+        '<?xml'
+        sage: w.children[0].value == w.svg
+        True
+        sage: PlotWidget(w.value).svg == w.svg # Cached
+        True
+    """
     value = traitlets.Instance(SageObject)
-    plot = traitlets.Instance(Graphics)
+    svg = traitlets.Unicode()
     name = traitlets.Unicode()
 
     def __init__(self, obj, figsize=4, name=None):
@@ -31,11 +191,62 @@ class PlotWidget(Box, BindableWidgetClass):
         self.value = obj
         if not name:
             name = repr(obj)
-        svgfilename = path_join(SAGE_TMP, '%s.svg' % name)
-        self.plot = plot(obj, figsize=figsize)
-        self.plot.save(svgfilename)
         self.name = name
-        self.children = [HTML(open(svgfilename, 'rb').read())]
+        self.figsize = figsize
+        self.abandoned = False
+        self.rendered = threading.Event()
+        self.children = [HTML(PLOT_PLACEHOLDER)]
+        svg = plots.get(obj, subkey=figsize)
+        if svg is not None:
+            self.finish(svg, None)
+            return
+        self.data = None
+        if plot_pool.processes:
+            try:
+                self.data = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                pass
+        if self.data is None:
+            thread = threading.Thread(target=self.render)
+            thread.daemon = True
+            thread.start()
+        else:
+            plot_pool.submit(self)
+
+    def render(self):
+        r"""
+        Plot the object in this thread.
+        """
+        try:
+            self.finish(plot_svg(self.value, self.figsize), None)
+        except Exception as e:
+            self.finish(None, "%s: %s" % (e.__class__.__name__, e))
+
+    def finish(self, svg, error):
+        r"""
+        Show the rendered `svg` document, or the `error` message.
+        """
+        self.data = None
+        if svg is not None:
+            plots.set(self.value, svg, subkey=self.figsize)
+        if not self.abandoned:
+            if svg is None:
+                self.children[0].value = '<div class="resultinfo">%s</div>' % escape("Cannot plot: %s" % error)
+            else:
+                self.svg = svg
+                self.children[0].value = svg
+        self.rendered.set()
+
+    def wait(self, timeout=None):
+        r"""
+        Wait for the plot to be rendered, and return its svg document.
+        """
+        self.rendered.wait(timeout)
+        return self.svg
+
+    def close(self):
+        self.abandoned = True
+        super(PlotWidget, self).close()
 
 sage.schemes.curves.curve.Curve_generic._widget_ = PlotWidget
 
@@ -45,23 +256,512 @@ sage.schemes.curves.curve.Curve_generic._widget_ = PlotWidget
 # not yet have a ParentMethods
 sage.categories.crystals.Crystals.ParentMethods._widget_ = PlotWidget
 sage.combinat.posets.poset_examples.Posets().Finite().ParentMethods._widget_ = PlotWidget
-sage.graphs.generic_graph.GenericGraph._widget_ = PlotWidget
+
+GRAPH_RASTER_MIN_VERTICES = 200 # Larger graphs are laid out and drawn with NumPy, see LargeGraphWidget
+SPRING_MAX_VERTICES = 1000 # Larger graphs keep their spectral layout
+GRAPH_PIXELS = 600 # Size of large graph images, in pixels
+
+def graph_arrays(g):
+    r"""
+    Return the vertices of graph `g`, and its edges as an array
+    of pairs of vertex positions.
+
+    TESTS::
+        sage: from sage_explorer._widgets import graph_arrays
+        sage: vertices, edges = graph_arrays(graphs.PathGraph(3))
+        sage: vertices, edges.tolist()
+        ([0, 1, 2], [[0, 1], [1, 2]])
+    """
+    vertices = list(g)
+    index = dict((v, i) for i, v in enumerate(vertices))
+    edges = numpy.array([(index[u], index[v]) for u, v in g.edge_iterator(labels=False)], dtype=int)
+    return vertices, edges.reshape(-1, 2)
+
+def spectral_layout(n, edges):
+    r"""
+    Return positions for `n` vertices joined by `edges`: the eigenvectors
+    of the two smallest nonzero eigenvalues of the graph Laplacian.
+    """
+    if n < 3:
+        return numpy.random.RandomState(0).rand(n, 2)
+    rows = numpy.concatenate([edges[:, 0], edges[:, 1]])
+    cols = numpy.concatenate([edges[:, 1], edges[:, 0]])
+    degrees = numpy.bincount(rows, minlength=n).astype(float)
+    if n <= 3 * SPRING_MAX_VERTICES:
+        L = numpy.diag(degrees)
+        numpy.add.at(L, (rows, cols), -1)
+        vectors = numpy.linalg.eigh(L)[1][:, 1:3]
+    else: # Sparse eigensolver
+        try:
+            import scipy.sparse, scipy.sparse.linalg
+            L = scipy.sparse.diags(degrees) - scipy.sparse.coo_matrix(
+                (numpy.ones(len(rows)), (rows, cols)), shape=(n, n)).tocsr()
+            vectors = scipy.sparse.linalg.eigsh(L.tocsc(), k=3, sigma=-1e-3)[1][:, 1:3]
+        except Exception:
+            vectors = numpy.random.RandomState(0).rand(n, 2)
+    return vectors + 1e-3 * numpy.random.RandomState(0).rand(n, 2) # Separate equal positions
+
+def spring_layout(pos, edges, iterations=30):
+    r"""
+    Refine positions `pos` of vertices joined by `edges` with
+    Fruchterman-Reingold forces, all vertices being moved at once.
+    """
+    n = len(pos)
+    k2 = 1.0 / n # Square of the ideal edge length
+    step = 0.1
+    for _ in range(iterations):
+        delta = pos[:, numpy.newaxis, :] - pos[numpy.newaxis, :, :]
+        distance2 = numpy.maximum((delta ** 2).sum(axis=-1), 1e-6)
+        displacement = (delta * (k2 / distance2)[:, :, numpy.newaxis]).sum(axis=1) # Repulsion
+        d = pos[edges[:, 0]] - pos[edges[:, 1]]
+        force = d * (numpy.sqrt((d ** 2).sum(axis=1)) / numpy.sqrt(k2))[:, numpy.newaxis] # Attraction
+        numpy.add.at(displacement, edges[:, 0], -force)
+        numpy.add.at(displacement, edges[:, 1], force)
+        length = numpy.maximum(numpy.sqrt((displacement ** 2).sum(axis=1)), 1e-9)
+        pos = pos + displacement * (numpy.minimum(length, step) / length)[:, numpy.newaxis]
+        step *= 0.9
+    return pos
+
+graph_layouts = ObjectCache('graph_layouts', maxsize=16) # Layouts by graph fingerprint
+
+def graph_layout(g):
+    r"""
+    Return the pair (positions in the unit square, edges) for graph `g`.
+
+    Layouts are cached by the vertices and edges of the graph, so that
+    redrawing a graph, mutable or not, does not compute its layout again.
+
+    TESTS::
+        sage: from sage_explorer._widgets import graph_layout
+        sage: g = graphs.RandomGNP(300, 0.02)
+        sage: pos, edges = graph_layout(g)
+        sage: pos.shape, pos.min() >= 0, pos.max() <= 1
+        ((300, 2), True, True)
+        sage: graph_layout(g)[0] is pos
+        True
+    """
+    vertices, edges = graph_arrays(g)
+    fingerprint = hash_key(repr(vertices).encode('utf-8') + edges.tobytes())
+    layout = graph_layouts.get(fingerprint)
+    if layout is None:
+        pos = spectral_layout(len(vertices), edges)
+        if len(vertices) <= SPRING_MAX_VERTICES:
+            pos = spring_layout(pos, edges)
+        if len(vertices):
+            pos = pos - pos.min(axis=0)
+            pos = pos / numpy.maximum(pos.max(axis=0), 1e-9)
+        layout = (pos, edges)
+        graph_layouts.set(fingerprint, layout)
+    return layout
+
+def graph_png(pos, edges, size=GRAPH_PIXELS, zoom=1.0, center=(0.5, 0.5)):
+    r"""
+    Draw vertices at positions `pos` (in the unit square) and `edges`
+    into a PNG image of `size` pixels, seen around `center` with `zoom`.
+
+    Edges are sampled at each pixel of their length, all at once;
+    pixels crossed by many edges are darker.
+
+    TESTS::
+        sage: from sage_explorer._widgets import graph_layout, graph_png
+        sage: png = graph_png(*graph_layout(graphs.RandomGNP(500, 0.01)))
+        sage: png[:4]
+        b'\x89PNG'
+    """
+    margin = 0.05
+    xy = ((pos - numpy.array(center)) * zoom * (1 - 2 * margin) + 0.5) * (size - 1)
+    density = numpy.zeros(size * size)
+    if len(edges):
+        p0, p1 = xy[edges[:, 0]], xy[edges[:, 1]]
+        counts = numpy.clip(numpy.ceil(numpy.abs(p1 - p0).max(axis=1)), 1, 4 * size).astype(int) + 1
+        starts = numpy.repeat(numpy.cumsum(counts) - counts, counts)
+        t = (numpy.arange(counts.sum()) - starts) / numpy.repeat(counts - 1, counts).astype(float)
+        ids = numpy.repeat(numpy.arange(len(edges)), counts)
+        points = numpy.rint(p0[ids] + t[:, numpy.newaxis] * (p1 - p0)[ids]).astype(int)
+        inside = ((points >= 0) & (points < size)).all(axis=1)
+        points = points[inside]
+        density = numpy.bincount(points[:, 1] * size + points[:, 0], minlength=size * size).astype(float)
+    image = numpy.ones((size * size, 3))
+    image *= (1 - 0.7 * numpy.minimum(density / 2.0, 1))[:, numpy.newaxis] # Gray edges
+    image = image.reshape(size, size, 3)
+    radius = max(1, int(round(2 * numpy.sqrt(zoom))))
+    vertices = numpy.rint(xy).astype(int)
+    for dx in range(-radius + 1, radius):
+        for dy in range(-radius + 1, radius):
+            p = vertices + (dx, dy)
+            p = p[((p >= 0) & (p < size)).all(axis=1)]
+            image[p[:, 1], p[:, 0]] = (0.12, 0.47, 0.71)
+    return png_bytes((image[::-1] * 255).astype(numpy.uint8)) # y axis upwards
+
+class LargeGraphWidget(VBox):
+    r"""
+    A raster drawing of graph `obj`, too large for :class:`PlotWidget`.
+
+    The layout is computed once, with NumPy (see :func:`graph_layout`);
+    zooming and moving redraw the image from it.
+
+    TESTS::
+        sage: from sage_explorer._widgets import LargeGraphWidget
+        sage: w = LargeGraphWidget(graphs.RandomGNP(400, 0.01))
+        sage: w.info.value
+        '400 vertices, ... edges'
+        sage: w.zoom.value = 4; w.x.value = 0.2
+        sage: w.image.value[:4]
+        b'\x89PNG'
+    """
+    value = traitlets.Any()
+
+    def __init__(self, obj, size=GRAPH_PIXELS):
+        super(LargeGraphWidget, self).__init__()
+        self.value = obj
+        self.size = size
+        self.pos, self.edges = graph_layout(obj)
+        self.image = Image(format='png', layout={'width': '%dpx' % size})
+        self.zoom = FloatSlider(value=1, min=1, max=16, step=0.5, description='Zoom', continuous_update=False)
+        self.x = FloatSlider(value=0.5, min=0, max=1, step=0.01, description='x', continuous_update=False)
+        self.y = FloatSlider(value=0.5, min=0, max=1, step=0.01, description='y', continuous_update=False)
+        for slider in (self.zoom, self.x, self.y):
+            slider.observe(lambda change: self.update(), names='value')
+        self.info = Label('%d vertices, %d edges' % (len(self.pos), len(self.edges)))
+        self.children = [self.image, HBox([self.zoom, self.x, self.y]), self.info]
+        self.update()
+
+    def update(self):
+        r"""
+        Draw the graph with the current zoom and center.
+        """
+        self.image.value = graph_png(self.pos, self.edges, self.size, self.zoom.value, (self.x.value, self.y.value))
+
+def graph_widget(g):
+    r"""
+    Return a widget for graph `g`: a plot, or a raster drawing if it has
+    more than ``GRAPH_RASTER_MIN_VERTICES`` vertices.
+    """
+    if g.order() > GRAPH_RASTER_MIN_VERTICES:
+        return LargeGraphWidget(g)
+    return PlotWidget(g)
+
+sage.graphs.generic_graph.GenericGraph._widget_ = graph_widget
 
 # The decision for whether to display the graph or not is duplicating what's
 # already done in the Jupyter notebook REPL; this logic should presumably be
 # shared.
 
 
+GRID_MAX_CELLS = 400 # Grids with more entries are shown in a window, see WindowedGridWidget
+
+def grid_entries(obj):
+    r"""
+    Return the grid of `obj` (a matrix, a partition, a skew partition,
+    or a list of rows, as a tableau or skew tableau) as a tuple
+    (number of rows, number of columns, number of cells, entry),
+    where entry(i, j) is the string in cell (i, j), or None if there is no such cell.
+
+    TESTS::
+        sage: from sage_explorer._widgets import grid_entries
+        sage: nrows, ncols, ncells, entry = grid_entries(Tableau([[1,2,3],[4]]))
+        sage: nrows, ncols, ncells, entry(0, 2), entry(1, 1)
+        (2, 3, 4, '3', None)
+        sage: nrows, ncols, ncells, entry = grid_entries(SkewPartition([[3,2],[1]]))
+        sage: nrows, ncols, ncells, entry(0, 0), entry(0, 1)
+        (2, 3, 4, None, '')
+        sage: grid_entries(matrix(ZZ, 30, 40))[:3]
+        (30, 40, 1200)
+    """
+    if isinstance(obj, sage.matrix.matrix2.Matrix):
+        return obj.nrows(), obj.ncols(), obj.nrows() * obj.ncols(), lambda i, j: str(obj[i, j])
+    if isinstance(obj, sage.combinat.skew_partition.SkewPartition):
+        outer, inner = list(obj.outer()), list(obj.inner())
+        inner += [0] * (len(outer) - len(inner))
+        return len(outer), max(outer or [0]), obj.size(), \
+            lambda i, j: '' if inner[i] <= j < outer[i] else None
+    if isinstance(obj, sage.combinat.partition.Partition):
+        rows = list(obj)
+        return len(rows), max(rows or [0]), sum(rows), lambda i, j: '' if j < rows[i] else None
+    rows = [list(row) for row in obj]
+    def entry(i, j):
+        if j < len(rows[i]) and rows[i][j] is not None:
+            return str(rows[i][j])
+    return len(rows), max([len(row) for row in rows] or [0]), \
+        sum(len([x for x in row if x is not None]) for row in rows), entry
+
+class WindowedGridWidget(VBox):
+    r"""
+    A view of the grid of `obj` (see :func:`grid_entries`) showing only
+    a window of `rows` rows and `cols` columns, moved with sliders.
+
+    Whatever the size of the grid, the window is one HTML table,
+    rendered in the kernel: the widget count does not grow with it.
+
+    TESTS::
+        sage: from sage_explorer._widgets import WindowedGridWidget
+        sage: w = WindowedGridWidget(matrix(ZZ, 200, 200, lambda i, j: i * j), rows=3, cols=3)
+        sage: w.table.value.count('<td'), w.info.value
+        (9, 'Rows 1 to 3, columns 1 to 3 of 200 x 200')
+        sage: w.rowslider.value, w.colslider.value = 100, 197
+        sage: '<td>19700</td>' in w.table.value, w.info.value
+        (True, 'Rows 101 to 103, columns 198 to 200 of 200 x 200')
+    """
+    value = traitlets.Any()
+
+    def __init__(self, obj, rows=20, cols=20):
+        super(WindowedGridWidget, self).__init__()
+        self.value = obj
+        self.nrows, self.ncols, self.ncells, self.entry = grid_entries(obj)
+        self.rows, self.cols = min(rows, self.nrows), min(cols, self.ncols)
+        self.table = HTML()
+        self.info = Label()
+        self.rowslider = IntSlider(min=0, max=self.nrows - self.rows, description='Row',
+                                   readout=False, continuous_update=False)
+        self.colslider = IntSlider(min=0, max=self.ncols - self.cols, description='Column',
+                                   readout=False, continuous_update=False)
+        self.rowslider.observe(lambda change: self.update(), names='value')
+        self.colslider.observe(lambda change: self.update(), names='value')
+        self.children = [self.table, self.info, HBox([self.rowslider, self.colslider])]
+        self.update()
+
+    def update(self):
+        r"""
+        Render the window at the position of the sliders.
+        """
+        i0, j0 = self.rowslider.value, self.colslider.value
+        lines = []
+        for i in range(i0, i0 + self.rows):
+            cells = []
+            for j in range(j0, j0 + self.cols):
+                entry = self.entry(i, j)
+                if entry is None:
+                    cells.append('<td style="border: none"></td>')
+                else:
+                    cells.append('<td>%s</td>' % escape(entry))
+            lines.append('<tr>%s</tr>' % ''.join(cells))
+        self.table.value = '<table style="border-collapse: collapse; text-align: center; font-family: monospace" ' \
+            'border="1" cellpadding="3">%s</table>' % ''.join(lines)
+        self.info.value = 'Rows %d to %d, columns %d to %d of %d x %d' \
+            % (i0 + 1, i0 + self.rows, j0 + 1, j0 + self.cols, self.nrows, self.ncols)
+
+def windowed_if_large(widget_class, max_cells=GRID_MAX_CELLS):
+    r"""
+    Return a widget factory building a `widget_class` widget for objects
+    with at most `max_cells` grid entries, else a :class:`WindowedGridWidget`.
+
+    TESTS::
+        sage: from sage_explorer._widgets import windowed_if_large, WindowedGridWidget
+        sage: from sage_combinat_widgets import GridViewWidget
+        sage: factory = windowed_if_large(GridViewWidget)
+        sage: factory(Partition([3,1])).__class__.__name__, factory(Partition([500])).__class__.__name__
+        ('GridViewWidget', 'WindowedGridWidget')
+    """
+    def _widget_(obj):
+        try:
+            large = grid_entries(obj)[2] > max_cells
+        except Exception:
+            large = False
+        if large:
+            return WindowedGridWidget(obj)
+        return widget_class(obj)
+    return _widget_
+
+HEATMAP_MIN_SIZE = 40 # Matrices with more rows or columns are shown as heatmaps
+HEATMAP_PIXELS = 400 # Size of heatmaps, in pixels
+FIELD_CODES_MAX = 1 << 16 # Finite fields up to that size get a table of the integer representations of their elements
+
+field_codes = ObjectCache('field_codes', maxsize=8) # Integer representations by element, by finite field
+
+def field_code_table(R):
+    r"""
+    Return a dictionary mapping the elements of finite field `R` to their
+    integer representation, or None if `R` has more than ``FIELD_CODES_MAX``
+    elements. Tables are computed once per field.
+
+    TESTS::
+        sage: from sage_explorer._widgets import field_code_table
+        sage: F.<z> = GF(4)
+        sage: sorted(field_code_table(F).values()), field_code_table(GF(2^20)) is None
+        ([0, 1, 2, 3], True)
+    """
+    if R.cardinality() > FIELD_CODES_MAX:
+        return
+    table = field_codes.get(R)
+    if table is None:
+        table = dict((x, x.integer_representation()) for x in R)
+        field_codes.set(R, table)
+    return table
+
+def matrix_array(m, mode='values'):
+    r"""
+    Return the entries of matrix `m` as a NumPy array of floats:
+    their values, or absolute values for complex entries, or,
+    if `mode` is 'sparsity', 1 for nonzero entries and 0 for others.
+
+    Matrices over integers, rationals and real or complex fields are
+    converted through double precision matrices, over prime fields
+    through their lift to the integers, over other finite fields
+    through the integer representation of their entries: from the
+    slices of the matrix over the prime field, for matrices over
+    `GF(2^k)`, else from a table of the elements of the field (see
+    :func:`field_code_table`), read without Python call per entry.
+    Other matrices fall back to their sparsity pattern.
+
+    TESTS::
+        sage: from sage_explorer._widgets import matrix_array
+        sage: matrix_array(matrix(QQ, [[1/2, 0], [0, -3]]))
+        array([[ 0.5,  0. ],
+               [ 0. , -3. ]])
+        sage: matrix_array(matrix(GF(7), [[6, 0]])), matrix_array(matrix(CDF, [[3*I, 0]]))
+        (array([[6., 0.]]), array([[3., 0.]]))
+        sage: matrix_array(matrix(ZZ, [[5, 0]], sparse=True), mode='sparsity')
+        array([[1., 0.]])
+        sage: F.<z> = GF(4); K.<y> = GF(9)
+        sage: matrix_array(matrix(F, [[z, 1], [z + 1, 0]])), matrix_array(matrix(K, [[y, 2]]))
+        (array([[2., 1.],
+               [3., 0.]]), array([[3., 2.]]))
+    """
+    if m.is_sparse():
+        a = numpy.zeros((m.nrows(), m.ncols()))
+        entries = m.dict()
+        if entries:
+            rows, cols = numpy.array(list(entries.keys())).T
+            if mode == 'sparsity':
+                a[rows, cols] = 1
+            else: # Convert the nonzero entries only, as a dense row
+                a[rows, cols] = matrix_array(sage.all.matrix(m.base_ring(), 1, len(entries), list(entries.values())))[0]
+        return a
+    R = m.base_ring()
+    a = None
+    try:
+        if R.is_finite() and R.characteristic() != R.cardinality():
+            if hasattr(m, 'slice'): # Over GF(2^k): m is the sum of the slices times the powers of the generator
+                a = sum(matrix_array(s) * 2 ** i for i, s in enumerate(m.slice()))
+            else:
+                table = field_code_table(R)
+                codes = map(table.__getitem__ if table else operator.methodcaller('integer_representation'), m.list())
+                a = numpy.fromiter(codes, dtype=float, count=m.nrows() * m.ncols()).reshape(m.nrows(), m.ncols())
+        elif R.is_finite():
+            m = m.lift()
+        if a is None:
+            for ring in (sage.all.RDF, sage.all.CDF):
+                try:
+                    a = m.change_ring(ring).numpy()
+                except (TypeError, ValueError, ArithmeticError):
+                    continue
+                if ring is sage.all.CDF:
+                    a = numpy.abs(a)
+                break
+    except Exception:
+        pass
+    if a is None: # Entries cannot be converted to numbers
+        return matrix_array(m.sparse_matrix(), 'sparsity')
+    if mode == 'sparsity':
+        return (a != 0).astype(float)
+    return a
+
+def png_bytes(image):
+    r"""
+    Encode `image`, an array of RGB or RGBA bytes, as PNG, favoring speed over size.
+    """
+    import matplotlib.image
+    buf = BytesIO()
+    matplotlib.image.imsave(buf, image, format='png', pil_kwargs={'compress_level': 1})
+    return buf.getvalue()
+
+def heatmap_png(a, size=HEATMAP_PIXELS, colormap='viridis'):
+    r"""
+    Render the 2-dimensional array `a` as a PNG heatmap of at most
+    `size` pixels in each direction: larger arrays are shrunk by averaging
+    blocks of entries, smaller ones are scaled up.
+
+    TESTS::
+        sage: from sage_explorer._widgets import heatmap_png
+        sage: import numpy
+        sage: png = heatmap_png(numpy.random.rand(2000, 2000)) # long time
+        sage: png[:4]
+        b'\x89PNG'
+    """
+    import matplotlib
+    a = numpy.asarray(a, dtype=float)
+    n, m = a.shape
+    factor = -(-max(n, m, 1) // size) # Ceiling of the division
+    if factor > 1:
+        mean = numpy.mean
+        if n % factor or m % factor: # Pad with missing values
+            a = numpy.pad(a, ((0, -n % factor), (0, -m % factor)), mode='constant', constant_values=numpy.nan)
+            mean = numpy.nanmean
+        a = mean(a.reshape(a.shape[0] // factor, factor, a.shape[1] // factor, factor), axis=(1, 3))
+    else:
+        scale = max(1, size // max(n, m, 1))
+        a = a.repeat(scale, axis=0).repeat(scale, axis=1)
+    low, high = numpy.nanmin(a), numpy.nanmax(a)
+    a = (a - low) / (high - low) if high > low else numpy.zeros_like(a)
+    try:
+        cmap = matplotlib.colormaps[colormap]
+    except AttributeError: # Older matplotlib
+        import matplotlib.cm
+        cmap = matplotlib.cm.get_cmap(colormap)
+    return png_bytes(cmap(a, bytes=True))
+
+class MatrixHeatmapWidget(VBox):
+    r"""
+    A heatmap of the entries of matrix `obj`, of their values
+    or of their sparsity pattern, rendered as one raster image.
+
+    TESTS::
+        sage: from sage_explorer._widgets import MatrixHeatmapWidget
+        sage: from time import time
+        sage: m = random_matrix(RDF, 2000)
+        sage: t = time(); w = MatrixHeatmapWidget(m); time() - t < 1 # long time
+        True
+        sage: w.info.value
+        '2000 x 2000 matrix over Real Double Field'
+        sage: w.mode.value = 'sparsity'
+        sage: w.image.value[:4]
+        b'\x89PNG'
+    """
+    value = traitlets.Any()
+
+    def __init__(self, obj, mode='values'):
+        super(MatrixHeatmapWidget, self).__init__()
+        self.value = obj
+        self.image = Image(format='png', layout={'width': '%dpx' % HEATMAP_PIXELS})
+        self.mode = ToggleButtons(options=[('Values', 'values'), ('Sparsity', 'sparsity')], value=mode)
+        self.mode.observe(lambda change: self.update(), names='value')
+        self.info = Label('%d x %d matrix over %s' % (obj.nrows(), obj.ncols(), obj.base_ring()))
+        self.children = [self.image, HBox([self.mode, self.info])]
+        self.update()
+
+    def update(self):
+        r"""
+        Render the heatmap for the current mode.
+        """
+        self.image.value = heatmap_png(matrix_array(self.value, self.mode.value))
+
+small_matrix_widget = None # Set below if sage-combinat-widgets is installed
+
+def matrix_widget(m):
+    r"""
+    Return a widget for matrix `m`: a heatmap if it has more than
+    ``HEATMAP_MIN_SIZE`` rows or columns, else a grid, if available.
+    """
+    if max(m.nrows(), m.ncols()) > HEATMAP_MIN_SIZE:
+        return MatrixHeatmapWidget(m)
+    if small_matrix_widget:
+        return small_matrix_widget(m)
+
+# Matrix is an extension class: it cannot get a _widget_ attribute
+widget_bindings.append((sage.matrix.matrix2.Matrix, matrix_widget))
+
 # Additional widgets if sage-combinat-widgets is installed
 try:
     import sage_combinat_widgets
 except:
     pass
 else:
-    sage.combinat.tableau.Tableau._widget_ = sage_combinat_widgets.GridViewWidget
-    sage.combinat.skew_tableau.SkewTableau._widget_ = sage_combinat_widgets.GridViewWidget
-    sage.combinat.partition.Partition._widget_ = sage_combinat_widgets.grid_view_widget.PartitionGridViewWidget
-    sage.combinat.skew_partition.SkewPartition._widget_ = sage_combinat_widgets.grid_view_widget.PartitionGridViewWidget
+    sage.combinat.tableau.Tableau._widget_ = windowed_if_large(sage_combinat_widgets.GridViewWidget)
+    sage.combinat.skew_tableau.SkewTableau._widget_ = windowed_if_large(sage_combinat_widgets.GridViewWidget)
+    sage.combinat.partition.Partition._widget_ = \
+        windowed_if_large(sage_combinat_widgets.grid_view_widget.PartitionGridViewWidget)
+    sage.combinat.skew_partition.SkewPartition._widget_ = \
+        windowed_if_large(sage_combinat_widgets.grid_view_widget.PartitionGridViewWidget)
     #sage.graphs.graph.Graph._widget_ = sage_combinat_widgets.GridViewWidget # FIXME only GridGraph and AztecDiamondGraph
     #sage.graphs.AztecDiamondGraph._widget_ = sage_combinat_widgets.GridViewWidget
-    sage.matrix.matrix2._widget_ = sage_combinat_widgets.GridViewWidget
+    small_matrix_widget = windowed_if_large(sage_combinat_widgets.GridViewWidget)
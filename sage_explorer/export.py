@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+r"""
+Static HTML export of explorer pages
+
+Export the explorer page of an object, and the pages reachable from it
+through property links up to a given depth, into a directory of plain
+HTML files. Docs and plots are rendered at export time, so the bundle
+can be served by any static file server, without a Sage kernel.
+Methods are listed with their documentation, but cannot be called.
+
+EXAMPLES::
+
+    sage: from sage_explorer.export import export_html
+    sage: export_html(Partition([3,3,2,1]), tmp_dir(), depth=2)
+    '.../index.html'
+"""
+import os, base64
+from inspect import isclass
+try:
+    from html import escape
+except ImportError: # Python 2
+    from cgi import escape
+from .sage_explorer import css_lines, get_explored_members, property_labels, property_values, is_menu_member, \
+    group_by_origin, doc_to_html, extract_classname, get_widget, object_key
+from ._cache import hash_key
+
+PLOT_TIMEOUT = 60 # Time to wait for a plot, before exporting the repr instead, in seconds
+
+PAGE_TEMPLATE = u"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>%(title)s</title>
+<style>
+%(css)s
+.page {display: flex; flex-wrap: wrap}
+.menus {width: 30%%}
+.help {width: 65%%; height: 600px; border: none}
+</style>
+</head>
+<body>
+<div class="page">
+<div class="titlebox lightborder">
+<div class="title-level1">%(title)s</div>
+<div class="title-level2">Properties</div>
+<ul>%(properties)s</ul>
+<p><a href="javascript:history.back()">Back</a> | <a href="index.html">Start</a></p>
+</div>
+<div class="visualbox">%(visual)s</div>
+</div>
+<div class="page">
+<div class="menus lightborder">
+<div class="title-level2">Menus</div>
+%(menus)s
+</div>
+<iframe class="help lightborder" name="help" src="%(doc)s"></iframe>
+</div>
+</body>
+</html>
+"""
+
+DOC_TEMPLATE = u"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"></head>
+<body>
+%s
+</body>
+</html>
+"""
+
+def visual_html(obj):
+    r"""
+    Render the visual part of the page for object `obj`:
+    its plot, if its widget is a plot, its image, if its widget
+    renders one (large graphs, matrix heatmaps), else its ascii art
+    or repr.
+
+    TESTS::
+        sage: from sage_explorer.export import visual_html
+        sage: visual_html(Partition([3,3,2,1]))
+        '<pre>***\n***\n**\n*</pre>'
+        sage: visual_html(matrix(RDF, 50, 50, lambda i, j: i*j))
+        '<img src="data:image/png;base64,...">'
+    """
+    try:
+        w = get_widget(obj)
+    except Exception:
+        w = None
+    if w is not None:
+        svg = w.wait(PLOT_TIMEOUT) if hasattr(w, 'svg') else None # A PlotWidget: wait for its plot
+        png = getattr(getattr(w, 'image', None), 'value', None) # A raster widget: its current image
+        w.close()
+        if svg:
+            return svg
+        if png:
+            return u'<img src="data:image/png;base64,%s">' % base64.b64encode(png).decode('ascii')
+    try:
+        text = str(obj._ascii_art_())
+    except Exception:
+        text = repr(obj)
+    return u"<pre>%s</pre>" % escape(text)
+
+class HTMLExporter(object):
+    r"""
+    Write explorer pages of objects into `directory`.
+
+    Pages are named after the object keys, so that an object reached
+    several times is exported only once; docs are written once
+    in the ``docs`` subdirectory and shared by all pages. Objects
+    without a key are identified by their id, so the exporter keeps
+    them alive until it is discarded.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.pages = {}
+        self.objects = [] # Objects keyed by id, kept alive so that their ids are not reused
+        self.docs = set()
+        if not os.path.isdir(os.path.join(directory, 'docs')):
+            os.makedirs(os.path.join(directory, 'docs'))
+
+    def write(self, filename, content):
+        with open(os.path.join(self.directory, filename), 'wb') as f:
+            f.write(content.encode('utf-8'))
+
+    def doc_page(self, doc):
+        r"""
+        Write the rendered docstring `doc`, if not done yet,
+        and return its file name.
+        """
+        filename = "docs/%s.html" % hash_key(doc or '')
+        if not filename in self.docs:
+            self.write(filename, DOC_TEMPLATE % doc_to_html(doc))
+            self.docs.add(filename)
+        return filename
+
+    def export(self, obj, depth=1, filename=None):
+        r"""
+        Export the page of object `obj`, and recursively the pages
+        of its property values up to `depth` more levels.
+        Return the file name of the page.
+        """
+        key = object_key(obj)
+        if key is None:
+            key = ('id', id(obj))
+            if not key in self.pages:
+                self.objects.append(obj)
+        if key in self.pages:
+            return self.pages[key]
+        filename = filename or "%s.html" % hash_key(key)
+        self.pages[key] = filename
+        members = get_explored_members(obj)
+        labels = property_labels(obj, members)
+        properties = [m for m in members if m.name in labels]
+        values = property_values(obj, properties)
+        items = []
+        for p in properties:
+            value = values[p.name]
+            label = labels[p.name] + ('?' if type(value) is type(True) else ':')
+            text = escape(str(value))
+            if depth > 0 and value is not None and type(value) is not type(True):
+                text = u'<a href="%s">%s</a>' % (self.export(value, depth - 1), text)
+            items.append(u"<li>%s %s</li>" % (escape(label), text))
+        menus = []
+        c0 = obj if isclass(obj) else obj.__class__
+        methods = [m for m in members if 'method' in m.member_type and is_menu_member(m, labels)]
+        for c, section in group_by_origin(c0, methods):
+            links = [u'<li><a href="%s" target="help">%s</a></li>' % (self.doc_page(m.member.__doc__), escape(m.name))
+                     for m in section]
+            menus.append(u"<details><summary>%s</summary><ul>%s</ul></details>"
+                         % (escape(extract_classname(c)), ''.join(links)))
+        self.write(filename, PAGE_TEMPLATE % {
+            'title': escape("Exploring: %s" % repr(obj)),
+            'css': '\n'.join(css_lines),
+            'properties': ''.join(items),
+            'visual': visual_html(obj),
+            'menus': '\n'.join(menus),
+            'doc': self.doc_page(obj.__doc__)})
+        return filename
+
+def export_html(obj, directory, depth=1):
+    r"""
+    Export the explorer page of `obj` into `directory` as static HTML,
+    following property links up to `depth` levels.
+
+    OUTPUT: the path of the start page, ``index.html``
+
+    TESTS::
+        sage: from sage_explorer.export import export_html
+        sage: d = tmp_dir()
+        sage: export_html(Partition([3,3,2,1]), d, depth=1) == os.path.join(d, 'index.html')
+        True
+        sage: len([f for f in os.listdir(d) if f.endswith('.html')]) > 1
+        True
+    """
+    HTMLExporter(directory).export(obj, depth, filename='index.html')
+    return os.path.join(directory, 'index.html')
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+r"""
+Offline introspection database
+
+Introspection results (members, origins and overrides, argspecs, member
+types) only depend on the Sage build. This module builds, once per Sage
+version, a read-only SQLite database holding the member index of every
+class reachable from ``sage.all`` and from the index page catalogs, and
+lets :func:`sage_explorer.sage_explorer.class_member_index` look classes
+up in it before doing any introspection.
+
+The database is opened read-only and memory-mapped, so that all kernels
+running on a host share its pages through the OS page cache.
+
+EXAMPLES::
+
+    $ sage -python -m sage_explorer.introspection_db --jobs 8
+"""
+from __future__ import print_function
+import os, sys, time, argparse, multiprocessing, pickle, sqlite3, zlib
+from inspect import isclass, ismodule, isroutine
+from ._cache import cache_directory, hash_key, SAGE_VERSION
+
+MMAP_SIZE = 1 << 30 # Upper bound on the mapped size of the database, in bytes
+
+def database_filename():
+    r"""
+    Return the path of the introspection database for this Sage version.
+
+    TESTS::
+        sage: from sage_explorer.introspection_db import database_filename
+        sage: database_filename().endswith('introspection.db')
+        True
+    """
+    return os.path.join(cache_directory(), SAGE_VERSION, 'introspection.db')
+
+class IntrospectionDatabase(object):
+    r"""
+    Read access to the introspection database, opened on first use.
+
+    TESTS::
+        sage: from sage_explorer.introspection_db import IntrospectionDatabase
+        sage: db = IntrospectionDatabase(tmp_filename())
+        sage: db.get(('sage.combinat.partition.Partition',)) is None
+        True
+    """
+    def __init__(self, filename=None):
+        self.filename = filename
+        self.connection = None
+        self.opened = False
+
+    def connect(self):
+        r"""
+        Open the database read-only, if it exists, and return the connection.
+        """
+        if self.opened:
+            return self.connection
+        self.opened = True
+        filename = self.filename or database_filename()
+        if not os.path.isfile(filename) or not os.path.getsize(filename):
+            return
+        try:
+            self.connection = sqlite3.connect('file:%s?mode=ro&immutable=1' % filename,
+                                              uri=True, check_same_thread=False)
+            self.connection.execute('PRAGMA mmap_size=%d' % MMAP_SIZE)
+        except sqlite3.Error:
+            self.connection = None
+        return self.connection
+
+    def get(self, key):
+        r"""
+        Return the member index stored for class key `key`, or None.
+        """
+        connection = self.connect()
+        if connection is None:
+            return
+        try:
+            row = connection.execute('SELECT data FROM members WHERE key = ?', (hash_key(key),)).fetchone()
+        except sqlite3.Error:
+            return
+        if row is None:
+            return
+        try:
+            return pickle.loads(zlib.decompress(row[0]))
+        except Exception: # Some default value cannot be unpickled any more
+            return
+
+introspection_db = IntrospectionDatabase()
+
+def class_locations():
+    r"""
+    Return the list of locations of the classes to introspect.
+
+    A location is a tuple (source, name, element): the class of attribute
+    `name` of source ``sage.all`` or of catalog `source`, or, if `element`,
+    the element class of this attribute.
+    Each class appears once.
+
+    TESTS::
+        sage: from sage_explorer.introspection_db import class_locations, resolve
+        sage: locations = class_locations()
+        sage: ('sage.all', 'ZZ', True) in locations
+        True
+        sage: resolve(('sage.all', 'ZZ', False))
+        <class 'sage.rings.integer_ring.IntegerRing_class'>
+    """
+    from .sage_explorer import class_key
+    locations, seen = [], set()
+    for source, container in sources():
+        for name in sorted(dir(container)):
+            if name.startswith('_'):
+                continue
+            for element in (False, True):
+                try:
+                    c = resolve((source, name, element), container)
+                    key = class_key(c)
+                except Exception:
+                    continue
+                if key in seen:
+                    continue
+                seen.add(key)
+                locations.append((source, name, element))
+    return locations
+
+def sources():
+    r"""
+    Return the containers of the classes to introspect, as pairs (label, container).
+    """
+    import sage.all
+    result = [('sage.all', sage.all)]
+    try:
+        from ._catalogs import catalogs
+    except ImportError:
+        catalogs = []
+    return result + list(catalogs)
+
+def resolve(location, container=None):
+    r"""
+    Return the class at `location` (see :func:`class_locations`).
+    """
+    source, name, element = location
+    if container is None:
+        container = dict(sources())[source]
+    obj = getattr(container, name)
+    if element:
+        if isclass(obj):
+            raise TypeError("%s is not a parent" % name)
+        obj = getattr(obj, 'element_class') # Only parents have one
+    if isclass(obj):
+        return obj
+    if ismodule(obj) or isroutine(obj):
+        raise TypeError("%s is not a class nor an instance" % name)
+    return obj.__class__
+
+def introspect(location):
+    r"""
+    Compute the member index of the class at `location`.
+
+    OUTPUT: a tuple (key, class name, compressed index) or
+    (None, location, error message)
+    """
+    from .sage_explorer import class_key, compute_member_index
+    try:
+        c = resolve(location)
+        data = zlib.compress(pickle.dumps(compute_member_index(c), protocol=2))
+    except Exception as e:
+        return None, location, "%s: %s" % (e.__class__.__name__, e)
+    return hash_key(class_key(c)), class_key(c)[0], data
+
+def init_worker():
+    r"""
+    Load Sage once in each worker process.
+    """
+    from . import sage_explorer
+
+def build_database(filename=None, jobs=None, verbose=True):
+    r"""
+    Build the introspection database into `filename`,
+    introspecting classes in `jobs` worker processes.
+
+    The database is written to a temporary file, then moved into place.
+    Return the number of classes stored.
+    """
+    filename = filename or database_filename()
+    directory = os.path.dirname(filename)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    tmpname = filename + '.%d.tmp' % os.getpid()
+    connection = sqlite3.connect(tmpname)
+    connection.execute('CREATE TABLE members (key TEXT PRIMARY KEY, name TEXT, data BLOB) WITHOUT ROWID')
+    start = time.time()
+    locations = class_locations()
+    count = 0
+    pool = multiprocessing.Pool(jobs, initializer=init_worker)
+    try:
+        for i, (key, name, data) in enumerate(pool.imap_unordered(introspect, locations, chunksize=8), 1):
+            if key is None:
+                if verbose:
+                    print("[%d/%d] %s FAILED: %s" % (i, len(locations), name, data))
+                continue
+            connection.execute('INSERT OR REPLACE INTO members VALUES (?, ?, ?)', (key, name, sqlite3.Binary(data)))
+            count += 1
+            if verbose and not i % 100:
+                print("[%d/%d] %.2fs" % (i, len(locations), time.time() - start))
+                sys.stdout.flush()
+    finally:
+        pool.close()
+        pool.join()
+    connection.commit()
+    connection.execute('VACUUM')
+    connection.close()
+    os.rename(tmpname, filename)
+    if verbose:
+        print("Stored %d classes into %s in %.2fs" % (count, filename, time.time() - start))
+    return count
+
+def main(args=None):
+    r"""
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(prog='sage-explorer-introspect',
+                                     description="Build the introspection database of Sage classes.")
+    parser.add_argument('-o', '--output', default=None,
+                        help="database file (default: %s)" % database_filename())
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="number of worker processes (default: number of cores)")
+    options = parser.parse_args(args)
+    build_database(options.output, options.jobs)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
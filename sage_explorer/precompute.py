@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+r"""
+Batch pre-computation of explorer pages
+
+Warm the persistent caches for a list of objects, before users open them.
+The input file holds one Sage expression per line (blank lines and lines
+starting with ``#`` are ignored). Each expression is evaluated as the
+explorer does it, and its page data (member index, property values,
+rendered docs) is computed in a pool of worker processes and written
+into the persistent caches.
+
+EXAMPLES::
+
+    $ sage -python -m sage_explorer.precompute objects.txt --jobs 8
+    [1/3]    0.91s  Partition([3,3,2,1])
+    [2/3]    2.35s  SymmetricGroup(5)
+    [3/3]    4.02s  graphs.PetersenGraph()
+    Precomputed 3 pages in 4.10s (0 failures)
+"""
+from __future__ import print_function
+import sys, time, argparse, multiprocessing
+
+def read_expressions(filename):
+    r"""
+    Read the Sage expressions in file `filename`, one per line.
+
+    TESTS::
+        sage: from sage_explorer.precompute import read_expressions
+        sage: filename = tmp_filename()
+        sage: with open(filename, 'w') as f:
+        ....:     _ = f.write("# Partitions\nPartition([3,2])\n\n  GF(7)\n")
+        sage: read_expressions(filename)
+        ['Partition([3,2])', 'GF(7)']
+    """
+    expressions = []
+    with open(filename) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                expressions.append(line)
+    return expressions
+
+def precompute(expression):
+    r"""
+    Evaluate `expression` and compute its explorer page data
+    into the persistent caches.
+
+    OUTPUT: a tuple (expression, time in seconds, error message or None)
+
+    TESTS::
+        sage: from sage_explorer.precompute import precompute
+        sage: precompute("Partition([3,3,2,1])")[2] is None
+        True
+        sage: precompute("Partition(")[2]
+        'SyntaxError: ...'
+    """
+    from .sage_explorer import eval_in_main, compute_page_data
+    start = time.time()
+    try:
+        compute_page_data(eval_in_main(expression))
+    except Exception as e:
+        return expression, time.time() - start, "%s: %s" % (e.__class__.__name__, e)
+    return expression, time.time() - start, None
+
+def init_worker():
+    r"""
+    Load Sage once in each worker process.
+    """
+    from . import sage_explorer
+
+def main(args=None):
+    r"""
+    Command line entry point.
+
+    Return the exit status: 0 if all pages were computed, else 1.
+    """
+    parser = argparse.ArgumentParser(prog='sage-explorer-precompute',
+                                     description="Precompute explorer pages into the persistent caches.")
+    parser.add_argument('filename', help="file of Sage expressions, one per line")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="number of worker processes (default: number of cores)")
+    options = parser.parse_args(args)
+    expressions = read_expressions(options.filename)
+    total, failures = len(expressions), 0
+    start = time.time()
+    pool = multiprocessing.Pool(options.jobs, initializer=init_worker)
+    try:
+        results = pool.imap_unordered(precompute, expressions)
+        for i, (expression, seconds, error) in enumerate(results, 1):
+            if error:
+                failures += 1
+                print("[%d/%d] %8.2fs  %s  FAILED: %s" % (i, total, seconds, expression, error))
+            else:
+                print("[%d/%d] %8.2fs  %s" % (i, total, seconds, expression))
+            sys.stdout.flush()
+    finally:
+        pool.close()
+        pool.join()
+    print("Precomputed %d pages in %.2fs (%d failures)" % (total - failures, time.time() - start, failures))
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
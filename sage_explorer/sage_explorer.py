@@ -14,7 +14,7 @@ AUTHORS:
 
 """
 import re
-from ipywidgets import Layout, Box, VBox, HBox, Text, Label, HTML, Select, Textarea, Accordion, Tab, Button
+from ipywidgets import Widget, Layout, Box, VBox, HBox, Text, Label, HTML, Select, Textarea, Tab, Button, IntSlider
 from traitlets import Any
 from inspect import getargspec, getmembers, getmro, isclass, isfunction, ismethod, ismethoddescriptor, isabstract
 try: # Are we in a Sage environment?
@@ -31,13 +31,46 @@ try:
     from cysignals.alarm import alarm, cancel_alarm, AlarmInterrupt
 except:
     AlarmInterrupt = None
-import yaml, os, six, operator as OP
+INTERRUPTS = (AlarmInterrupt,) if AlarmInterrupt else () # AlarmInterrupt is not an Exception
+try:
+    from inspect import getattr_static
+except ImportError: # Python 2
+    getattr_static = getattr
+from collections import OrderedDict
+try:
+    from collections.abc import Sequence, Set, Mapping, Iterator
+except ImportError: # Python 2
+    from collections import Sequence, Set, Mapping, Iterator
+try:
+    from html import escape
+except ImportError: # Python 2
+    from cgi import escape
+try:
+    from sage.categories.enumerated_sets import EnumeratedSets
+    from sage.categories.category import Category, JoinCategory
+    from sage.structure.category_object import CategoryObject
+    from sage.structure.element import Matrix
+except:
+    EnumeratedSets = Category = JoinCategory = CategoryObject = Matrix = None
+LAZY_TYPES = []
+try:
+    from sage.misc.lazy_import import LazyImport
+    from sage.misc.lazy_attribute import lazy_attribute
+    from sage.misc.cachefunc import CachedMethod
+    LAZY_TYPES = [(LazyImport, 'lazy_import'), (lazy_attribute, 'lazy_attribute'), (CachedMethod, 'cached_method')]
+except:
+    pass
+import yaml, os, six, math, time, numbers, hashlib, pickle, threading, operator as OP
 from IPython.core import display
+from ._cache import members_cache, properties_cache, docs_cache, argspecs_cache, property_cache, \
+    result_cache, arguments_key, ObjectCache, cache_registry
+from .introspection_db import introspection_db
 
 # CSS
 back_button_layout = Layout(width='7em')
 justified_h_layout = Layout(justify_content='space-between')
 main_h_layout = Layout(justify_content='flex-start')
+shared_layouts = (back_button_layout, justified_h_layout, main_h_layout)
 css_lines = []
 css_lines.append(".container {width:100% !important;}")
 css_lines.append(".invisible {display: none; width: 0; height: 0}")
@@ -50,6 +83,8 @@ css_lines.append(".visualbox {min-height: 100px; max-height: 400px; min-width: 3
 css_lines.append(".tabs {width: 100%}")
 css_lines.append(".widget-text .widget-label, .widget-box .widget-button {width: auto}")
 css_lines.append("UL {list-style-type: none; padding-left:0;}")
+css_lines.append(".resultinfo {font-size: 80%; color: grey}")
+css_lines.append(".output-elements {list-style-type: decimal; padding-left: 3em; font-family: monospace}")
 css = HTML("<style>%s</style>" % '\n'.join(css_lines))
 
 try:
@@ -79,6 +114,12 @@ def eval_in_main(s):
         return eval(s, __main__.__dict__)
 
 TIMEOUT = 15 # in seconds
+OUTPUT_PAGE_SIZE = 50 # Number of elements of a large or lazy output shown at once
+OUTPUT_TIME_BUDGET = 1.0 # Time for computing one page of elements, in seconds
+OUTPUT_MAX_CHARS = 20000 # Outputs longer than that are truncated
+ELEMENT_MAX_CHARS = 200 # Same for each element of a large or lazy output
+PREDICATE_TIMEOUT = 0.5 # Time for evaluating one `when` predicate of the properties configuration, in seconds
+STATIC_INTROSPECTION = True # Read class dictionaries instead of calling getattr, see getmembers_static
 EXCLUDED_MEMBERS = ['__init__', '__repr__', '__str__']
 OPERATORS = {'==' : OP.eq, '<' : OP.lt, '<=' : OP.le, '>' : OP.gt, '>=' : OP.ge}
 CONFIG_PROPERTIES = yaml.load(open(os.path.join(os.path.dirname(__file__),'properties.yml')))
@@ -102,6 +143,233 @@ def to_html(s):
     except:
         return s
 
+def truncate(s, maxchars):
+    r"""
+    Cut string `s` to `maxchars` characters, marking the cut with an ellipsis.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import truncate
+        sage: truncate('abcdef', 4), truncate('abc', 4)
+        ('abc…', 'abc')
+    """
+    if len(s) <= maxchars:
+        return s
+    return s[:maxchars - 1] + u'\u2026'
+
+def output_summary(out, maxchars=OUTPUT_MAX_CHARS, size=OUTPUT_PAGE_SIZE):
+    r"""
+    If method output `out` is too large to be converted to a string
+    as a whole, return a pair (text, description) summarizing it
+    without doing so, else None.
+
+    Integers of more than `maxchars` digits are shown by their first and
+    last digits, matrices of more than `maxchars` / 2 entries by their
+    first `size` rows and columns, and polynomials of more than `size`
+    terms by their `size` leading terms.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import output_summary
+        sage: output_summary(2^100000)
+        ('999002...09376', 'Integer of 30103 digits, 100001 bits')
+        sage: output_summary(2^1000) is None, output_summary(matrix(ZZ, 2, [1,2,3,4])) is None
+        (True, True)
+        sage: output_summary(matrix(ZZ, 500, 500))[1]
+        '500 x 500 matrix over Integer Ring: first 50 rows and 50 columns'
+        sage: R.<t> = QQ[]
+        sage: text, description = output_summary(sum(t^i for i in range(10^4)))
+        sage: text[:20], description
+        ('t^9999 + t^9998 + t^', 'Polynomial of degree 9999 with 10000 terms: first 50 terms')
+    """
+    try:
+        if isinstance(out, numbers.Integral) and not isinstance(out, bool):
+            n = abs(int(out))
+            nbits = n.bit_length()
+            digits = int(nbits * math.log10(2)) + 1
+            if digits <= maxchars:
+                return
+            if n < 10 ** (digits - 1):
+                digits -= 1
+            shown = ELEMENT_MAX_CHARS // 2 # Digits shown at each end
+            head, tail = n // 10 ** (digits - shown), n % 10 ** shown
+            text = u'%s%d\u2026%0*d' % ('-' if out < 0 else '', head, shown, tail)
+            return text, 'Integer of %d digits, %d bits' % (digits, nbits)
+        if Matrix is not None and isinstance(out, Matrix):
+            nrows, ncols = out.nrows(), out.ncols()
+            if nrows * ncols <= maxchars // 2:
+                return
+            rows, cols = min(nrows, size), min(ncols, size)
+            return str(out.submatrix(0, 0, rows, cols)), \
+                '%d x %d matrix over %s: first %d rows and %d columns' % (nrows, ncols, out.base_ring(), rows, cols)
+        if callable(getattr(out, 'number_of_terms', None)) and callable(getattr(out, 'dict', None)):
+            terms = out.number_of_terms()
+            if terms <= size:
+                return
+            coefficients = out.dict()
+            exponents = sorted(coefficients, reverse=True)[:size]
+            head = out.parent()(dict((e, coefficients[e]) for e in exponents))
+            return u'%s + \u2026' % head, \
+                'Polynomial of degree %s with %d terms: first %d terms' % (out.degree(), terms, size)
+    except Exception: # Not what it looked like
+        return
+
+def output_to_html(out, maxchars=OUTPUT_MAX_CHARS):
+    r"""
+    Render method output `out` as HTML, as :func:`to_html` does,
+    unless it is large: it is then summarized (see :func:`output_summary`),
+    or its string, if longer than `maxchars`, is truncated, and shown as is.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import output_to_html
+        sage: output_to_html(2^100000)
+        '<pre>999002...09376</pre><p class="resultinfo">Integer of 30103 digits, 100001 bits</p>'
+        sage: output_to_html('ab' * 20000)
+        '<pre>abab...</pre><p class="resultinfo">Output truncated to 20000 of 40000 characters</p>'
+    """
+    summary = output_summary(out, maxchars)
+    if summary:
+        text, description = summary
+        return u'<pre>%s</pre><p class="resultinfo">%s</p>' % (escape(truncate(text, maxchars)), escape(description))
+    s = str(out)
+    if len(s) <= maxchars:
+        return to_html(s)
+    return u'<pre>%s</pre><p class="resultinfo">Output truncated to %d of %d characters</p>' \
+        % (escape(s[:maxchars]), maxchars, len(s))
+
+def output_elements(out, page_size=OUTPUT_PAGE_SIZE):
+    r"""
+    If method output `out` is better shown element by element,
+    return a pair (description, iterator over its elements), else None.
+
+    This is the case for sequences, sets and mappings of more than
+    `page_size` elements (the elements of mappings being their pairs
+    (key, value)), iterators (including generators) and Sage enumerated sets;
+    their elements are then computed and shown by pages,
+    see :class:`OutputStream`.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import output_elements
+        sage: output_elements([1, 2]) is None, output_elements('a' * 1000) is None
+        (True, True)
+        sage: output_elements(list(range(10^6)))[0]
+        'list of 1000000 elements'
+        sage: description, items = output_elements(dict((i, i^2) for i in range(10^5)))
+        sage: description, next(items)
+        ('dict of 100000 items', (0, 0))
+        sage: output_elements(x for x in ZZ)[0]
+        'generator'
+        sage: output_elements(Partitions(100))[0]
+        'Partitions of the integer 100'
+    """
+    if isinstance(out, six.string_types + (bytes,)):
+        return
+    if isinstance(out, (Sequence, Set)):
+        if len(out) <= page_size:
+            return
+        return "%s of %d elements" % (type(out).__name__, len(out)), iter(out)
+    if isinstance(out, Mapping):
+        if len(out) <= page_size:
+            return
+        return "%s of %d items" % (type(out).__name__, len(out)), iter(out.items())
+    if isinstance(out, Iterator):
+        return type(out).__name__, out
+    try:
+        if EnumeratedSets is not None and out in EnumeratedSets():
+            return truncate(repr(out), ELEMENT_MAX_CHARS), iter(out)
+    except Exception: # No iterator after all
+        pass
+
+class OutputStream(object):
+    r"""
+    The elements of a large or lazy output, computed on demand by pages.
+
+    Each page holds at most `page_size` elements, and takes at most
+    about `budget` seconds to compute, unless a single element is longer
+    to get; computations are anyway interrupted after ``TIMEOUT`` seconds.
+    Only the elements of the current page are kept, each as a truncated
+    representation.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import OutputStream
+        sage: import itertools
+        sage: s = OutputStream('count', itertools.count(), page_size=3)
+        sage: s.next_page()
+        '<p class="resultinfo">count</p><ol class="output-elements" start="1"><li>0</li><li>1</li><li>2</li></ol>...'
+        sage: s.next_page()
+        '<ol class="output-elements" start="4"><li>3</li><li>4</li><li>5</li></ol>...'
+        sage: s.count, s.exhausted
+        (6, False)
+        sage: s = OutputStream('list', iter([1, 2]), page_size=3)
+        sage: s.next_page()
+        '<p class="resultinfo">list</p><ol class="output-elements" start="1"><li>1</li><li>2</li></ol><p class="resultinfo">2 elements</p>'
+        sage: s.exhausted
+        True
+    """
+    def __init__(self, description, iterator, page_size=OUTPUT_PAGE_SIZE, budget=OUTPUT_TIME_BUDGET):
+        self.description = description
+        self.iterator = iterator
+        self.page_size = page_size
+        self.budget = budget
+        self.count = 0 # Number of elements shown so far
+        self.exhausted = False
+
+    def next_page(self):
+        r"""
+        Compute the next page of elements, and return it as HTML.
+        """
+        items, error = [], None
+        start = time.time()
+        try:
+            if AlarmInterrupt:
+                alarm(TIMEOUT)
+            while len(items) < self.page_size and time.time() - start < self.budget:
+                try:
+                    item = next(self.iterator)
+                except StopIteration:
+                    self.exhausted = True
+                    break
+                items.append(escape(truncate(repr(item), ELEMENT_MAX_CHARS)))
+        except INTERRUPTS:
+            self.exhausted = True
+            error = "Timeout!"
+        except Exception as e:
+            self.exhausted = True
+            error = "%s: %s" % (e.__class__.__name__, e)
+        finally:
+            if AlarmInterrupt:
+                cancel_alarm()
+        html = u''
+        if not self.count:
+            html += u'<p class="resultinfo">%s</p>' % escape(self.description)
+        html += u'<ol class="output-elements" start="%d">%s</ol>' \
+            % (self.count + 1, ''.join(u'<li>%s</li>' % item for item in items))
+        self.count += len(items)
+        if error:
+            html += u'<p class="resultinfo">Stopped after %d elements: %s</p>' % (self.count, escape(error))
+        elif self.exhausted:
+            html += u'<p class="resultinfo">%d elements</p>' % self.count
+        else:
+            html += u'<p class="resultinfo">First %d elements</p>' % self.count
+        return html
+
+def doc_to_html(doc):
+    r"""Render docstring `doc` as HTML, through the persistent docs cache
+    INPUT: string doc
+    OUTPUT: string
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import doc_to_html, to_html
+        sage: from sage.combinat.partition import Partition
+        sage: doc_to_html(Partition.cells.__doc__) == to_html(Partition.cells.__doc__)
+        True
+    """
+    if not doc:
+        return to_html(doc)
+    html = docs_cache.get(doc)
+    if html is None:
+        html = to_html(doc)
+        docs_cache[doc] = html
+    return html
+
 def member_origins(obj, names):
     """Return class where methods in list 'names' are actually defined
     INPUT: object 'obj', list of method names
@@ -124,23 +392,121 @@ def member_origins(obj, names):
     c0 = obj
     if not isclass(c0):
         c0 = obj.__class__
-    # Initialisation
     origins, overrides = {}, {}
     for name in names:
-        origins[name] = c0
-        overrides[name] = []
-    for c in c0.__mro__[1:]:
-        for name in names:
-            if not name in [x[0] for x in getmembers(c)]:
-                continue
-            for x in getmembers(c):
-                if x[0] == name:
-                    if x[1] == getattr(c0, name):
-                        origins[name] = c
-                    else:
-                        overrides[name].append(c)
+        origins[name], overrides[name] = member_origin(c0, name)
     return origins, overrides
 
+def member_origin(c0, name):
+    r"""
+    Return the class of the mro of `c0` where member `name` is actually
+    defined, and the list of classes of the mro where it is overridden.
+
+    With `STATIC_INTROSPECTION`, only class dictionaries are read:
+    an origin is a class holding the very same value, an override
+    a class holding another one.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import member_origin
+        sage: from sage.combinat.partition import Partition
+        sage: member_origin(Partition([3,3,2,1]).__class__, 'add_cell')
+        (<class 'sage.combinat.partition.Partition'>, [])
+    """
+    mro = getmro(c0)
+    origin, overrides = c0, []
+    if STATIC_INTROSPECTION:
+        value = None
+        for c in mro:
+            if name in c.__dict__:
+                value = c.__dict__[name]
+                break
+        for c in mro[1:]:
+            if not name in c.__dict__:
+                continue
+            if c.__dict__[name] is value:
+                origin = c
+            else:
+                overrides.append(c)
+        return origin, overrides
+    value = getattr(c0, name)
+    for c in mro[1:]:
+        for x in getmembers(c):
+            if x[0] == name:
+                if x[1] == value:
+                    origin = c
+                else:
+                    overrides.append(c)
+    return origin, overrides
+
+def lazy_kind(value):
+    r"""
+    Return 'lazy_import', 'lazy_attribute' or 'cached_method'
+    if class attribute `value` is one of those, else None.
+    Only the type of `value` is looked at, so nothing gets resolved.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import lazy_kind
+        sage: from sage.combinat.partition import Partition
+        sage: from sage.structure.parent import Parent
+        sage: lazy_kind(Partition.add_cell), lazy_kind(Parent.__dict__['element_class'])
+        (None, 'lazy_attribute')
+    """
+    for t, kind in LAZY_TYPES:
+        if issubclass(type(value), t):
+            return kind
+
+introspection_stats = {'lazy_import': 0, 'lazy_attribute': 0, 'cached_method': 0}
+
+def getmembers_static(c0):
+    r"""
+    Return the members of class `c0` as a list of pairs (name, value),
+    sorted by name, as :func:`inspect.getmembers` does, but without
+    calling ``getattr``: class dictionaries along the mro are read,
+    so that lazy imports are not imported, lazy attributes not
+    evaluated and cached methods returned as such.
+    Static and class methods only are bound to `c0`.
+
+    Each lazy import, lazy attribute or cached method met is counted in
+    `introspection_stats`: an import or evaluation that did not happen.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import getmembers_static
+        sage: from sage.combinat.partition import Partition
+        sage: members = dict(getmembers_static(Partition([3,3,2,1]).__class__))
+        sage: members['add_cell'] is Partition.add_cell
+        True
+    """
+    members = {}
+    for c in getmro(c0):
+        for name in c.__dict__:
+            if name in members:
+                continue
+            value = c.__dict__[name]
+            kind = lazy_kind(value)
+            if kind:
+                introspection_stats[kind] += 1
+            elif isinstance(value, (staticmethod, classmethod)):
+                value = getattr(c0, name)
+            members[name] = value
+    return sorted(members.items(), key=lambda x: x[0])
+
+def getattr_member(c0, name):
+    r"""
+    Get member `name` of class `c0`, statically with `STATIC_INTROSPECTION`.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import getattr_member
+        sage: from sage.combinat.partition import Partition
+        sage: getattr_member(Partition, 'add_cell') is Partition.add_cell
+        True
+    """
+    if not STATIC_INTROSPECTION:
+        return getattr(c0, name)
+    value = getattr_static(c0, name)
+    if isinstance(value, (staticmethod, classmethod)):
+        return getattr(c0, name)
+    return value
+
 def pretty_name(s):
     r"""
     Transform a name for lisibility on the interface.
@@ -193,10 +559,15 @@ def extract_classname(c, element_ok=False):
         return 'Element of a ' + pretty_name(parent)
     return pretty_name(last)
 
+widget_bindings = [] # Pairs (class, widget factory), for classes which cannot get a _widget_ attribute
+
 def get_widget(obj):
     r"""
     Which is the specialized widget class name for viewing this object (if any)
 
+    This is given by the ``_widget_`` attribute of the object,
+    else by the first matching class in ``widget_bindings``.
+
     TESTS::
         sage: from sage.all import *
         sage: from sage_explorer._widgets import *
@@ -209,16 +580,217 @@ def get_widget(obj):
         return
     if hasattr(obj, "_widget_"):
         return obj._widget_()
-    else:
+    for cls, factory in widget_bindings:
+        if isinstance(obj, cls):
+            return factory(obj)
+
+predicate_cache = ObjectCache('predicates', maxsize=4096) # Predicate values by object and predicate
+predicate_costs = {} # Total time and number of evaluations, by predicate
+
+def parse_predicate(predicate):
+    r"""
+    Split `when` predicate `predicate` into the name of the method to call,
+    and the operator and value to compare its result with, if any.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import parse_predicate
+        sage: parse_predicate('is_finite')
+        ('is_finite', None, None)
+        sage: parse_predicate('cardinality < 21'), parse_predicate('cardinality<=21')
+        (('cardinality', <built-in function lt>, '21'), ('cardinality', <built-in function le>, '21'))
+        sage: parse_predicate('cardinality ~ 21')
+        Traceback (most recent call last):
+        ...
+        ValueError: Cannot parse predicate 'cardinality ~ 21'
+    """
+    match = re.match(r'^\s*(\w+)\s*(?:(==|<=|>=|<|>)\s*(.+?))?\s*$', predicate)
+    if not match:
+        raise ValueError("Cannot parse predicate '%s'" % predicate)
+    funcname, operatorsign, complement = match.groups()
+    return funcname, OPERATORS.get(operatorsign), complement
+
+def predicate_cost(predicate):
+    r"""
+    Return the average time taken so far by evaluations of `predicate`,
+    0 if it was never evaluated.
+    """
+    total, count = predicate_costs.get(predicate, (0, 0))
+    return total / count if count else 0
+
+def in_main_thread():
+    r"""
+    Return whether the caller runs in the main thread: alarms, being
+    signals, are only delivered there, and must not be set elsewhere.
+    """
+    main_thread = getattr(threading, 'main_thread', None)
+    if main_thread is None: # Python 2
+        return isinstance(threading.current_thread(), threading._MainThread)
+    return threading.current_thread() is main_thread() # Also right in processes forked from a thread
+
+def evaluate_predicate(obj, predicate, timeout=PREDICATE_TIMEOUT):
+    r"""
+    Evaluate `when` predicate `predicate` (a method name, possibly followed
+    by a comparison, as ``cardinality < 21``) on object `obj`.
+
+    The evaluation is interrupted after `timeout` seconds.
+    Values are cached by object and predicate.
+    Outside of the main thread, where no alarm can interrupt it, a method
+    is never called: uncached predicates are left to the main thread.
+
+    OUTPUT: True or False, or None if the predicate could not be evaluated:
+    missing method, error, timeout or not in the main thread
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import evaluate_predicate
+        sage: evaluate_predicate(GF(7), 'cardinality < 21'), evaluate_predicate(GF(29), 'cardinality < 21')
+        (True, False)
+        sage: evaluate_predicate(GF(7), 'is_finite'), evaluate_predicate(GF(7), 'no_such_method')
+        (True, None)
+        sage: class Slow(SageObject):
+        ....:     def is_slow(self):
+        ....:         sleep(5)
+        ....:         return True
+        sage: evaluate_predicate(Slow(), 'is_slow') is None
+        True
+        sage: import threading
+        sage: results = []
+        sage: thread = threading.Thread(target=lambda: results.append(evaluate_predicate(GF(11), 'is_field')))
+        sage: thread.start(); thread.join()
+        sage: results, evaluate_predicate(GF(11), 'is_field')
+        ([None], True)
+    """
+    cached = predicate_cache.get(obj, subkey=predicate)
+    if cached is not None:
+        return cached[0]
+    value = None
+    start = time.time()
+    try:
+        funcname, operator, complement = parse_predicate(predicate)
+        if funcname == 'isclass':
+            res = isclass(obj)
+        elif not in_main_thread():
+            return
+        else:
+            if AlarmInterrupt:
+                alarm(timeout)
+            try:
+                res = getattr(obj, funcname)
+                if callable(res):
+                    res = res()
+            finally:
+                if AlarmInterrupt:
+                    cancel_alarm()
+        if operator:
+            res = operator(res, eval_in_main(complement))
+        value = bool(res)
+    except INTERRUPTS + (Exception,): # Timeout, missing method or error
+        pass
+    total, count = predicate_costs.get(predicate, (0, 0))
+    predicate_costs[predicate] = (total + time.time() - start, count + 1)
+    predicate_cache.set(obj, (value,), subkey=predicate)
+    return value
+
+rule_containers = {} # Containers of the `in` rules of the properties configuration, by name
+
+def rule_container(name):
+    r"""
+    Return the container named `name` in an `in` rule of the properties
+    configuration: a category, as ``Sets`` or ``EnumeratedSets.Finite``,
+    or a parent, as ``Partitions()``; None if it cannot be evaluated.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import rule_container
+        sage: rule_container('Sets'), rule_container('Semigroups.Finite')
+        (Category of sets, Category of finite semigroups)
+        sage: rule_container('Partitions()')
+        Partitions
+        sage: rule_container('NoSuchCategory') is None
+        True
+    """
+    try:
+        return rule_containers[name]
+    except KeyError:
+        pass
+    try:
+        parts = name.split('.')
+        if re.match(r'^\w+(\.\w+)+$', name): # A category with axioms
+            container = eval_in_main(parts[0])()
+            for axiom in parts[1:]:
+                container = getattr(container, axiom)()
+        else:
+            container = eval_in_main(name)
+            if isclass(container) and issubclass(container, Category):
+                container = container()
+    except Exception:
+        container = None
+    rule_containers[name] = container
+    return container
+
+category_indexes = ObjectCache('category_indexes', maxsize=1024) # Super categories by category
+
+def category_index(category):
+    r"""
+    Return the set of the super categories of `category`, itself included.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import category_index
+        sage: Sets() in category_index(Fields().Finite())
+        True
+    """
+    index = category_indexes.get(category)
+    if index is None:
+        index = frozenset(category.all_super_categories())
+        category_indexes.set(category, index)
+    return index
+
+def rule_contains(obj, name):
+    r"""
+    Test whether `obj` belongs to the container named `name`
+    (see :func:`rule_container`).
+
+    For parents and categories, this is a lookup in the index of
+    the super categories of their category; other cases are tested
+    with ``in``.
+
+    OUTPUT: True or False, or None if this cannot be determined
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import rule_contains
+        sage: rule_contains(GF(7), 'Fields.Finite'), rule_contains(QQ, 'Fields.Finite'), rule_contains(QQ, 'Sets')
+        (True, False, True)
+        sage: rule_contains(Partitions(3), 'EnumeratedSets.Finite'), rule_contains(Partition([2,1]), 'Sets')
+        (True, False)
+        sage: rule_contains(Partition([2,1]), 'Partitions()'), rule_contains(QQ, 'NoSuchCategory')
+        (True, None)
+    """
+    container = rule_container(name)
+    if container is None:
+        return
+    if isinstance(container, Category) and isinstance(obj, CategoryObject):
+        try:
+            index = category_index(obj.category())
+        except Exception:
+            index = None
+        if index is not None:
+            if isinstance(container, JoinCategory):
+                return all(c in index for c in container.super_categories())
+            return container in index
+    try:
+        return obj in container
+    except Exception:
         return
 
-def property_label(obj, funcname):
+def property_label(obj, funcname, config=None):
     r"""
     Test whether this method, for this object,
     will be calculated at opening and displayed on this widget
     If True, return a label.
 
-    INPUT: object obj, method name funcname
+    Rules are checked cheapest first: types, then categories, then
+    `when` predicates, by increasing average cost. Predicates that
+    cannot be evaluated in time count as failed.
+
+    INPUT: object obj, method name funcname, configuration config (default: CONFIG_PROPERTIES)
     OUTPUT: String or None
 
     TESTS::
@@ -231,10 +803,16 @@ def property_label(obj, funcname):
         sage: property_label(st, "is_standard")
         sage: property_label(st, "parent")
         'Element of'
+        sage: property_label(QQ['x'], "base_ring")
+        'Base Ring'
+        sage: property_label(GF(7), "multiplication_table"), property_label(GF(29), "multiplication_table")
+        ('Multiplication Table', None)
     """
-    if not funcname in CONFIG_PROPERTIES.keys():
+    if config is None:
+        config = CONFIG_PROPERTIES
+    if not funcname in config.keys():
         return
-    config = CONFIG_PROPERTIES[funcname]
+    config = config[funcname]
     if 'isinstance' in config.keys():
         """Test isinstance"""
         if not isinstance(obj, eval_in_main(config['isinstance'])):
@@ -245,75 +823,25 @@ def property_label(obj, funcname):
             return
     if 'in' in config.keys():
         """Test in"""
-        try:
-            if not obj in eval_in_main(config['in']):
-                return
-        except:
-            return # The error is : descriptor 'category' of 'sage.structure.parent.Parent' object needs an argument
+        if not rule_contains(obj, config['in']):
+            return
     if 'not in' in config.keys():
         """Test not in"""
-        if obj in eval_in_main(config['not in']):
+        if rule_contains(obj, config['not in']) is not False:
             return
-    def test_when(funcname, expected, operator=None, complement=None):
-        if funcname == 'isclass': # FIXME Prendre les premières valeurs de obj.getmembers pour le test -> calculer cette liste avant ?
-            res = eval_in_main(funcname)(obj)
-        else:
-            res = getattr(obj, funcname)
-        if operator and complement:
-            res = operator(res, eval_in_main(complement))
-        return (res == expected)
-    def split_when(s):
-        when_parts = config['when'].split()
-        funcname = when_parts[0]
-        if len(when_parts) > 2:
-            operatorsign, complement = when_parts[1], when_parts[2]
-        elif len(when_parts) > 1:
-            operatorsign, complement = when_parts[1][0], when_parts[1][1:]
-        if operatorsign in OPERATORS.keys():
-            operator = OPERATORS[operatorsign]
-        else:
-            operator = "not found"
-        return funcname, operator, complement
-    if 'when' in config.keys():
-        """Test when predicate(s)"""
-        if isinstance(config['when'], six.string_types):
-            when = [config['when']]
-        elif isinstance(config['when'], (list,)):
-            when = config['when']
+    for key, expected in (('when', True), ('not when', False)):
+        """Test when and not when predicate(s), cheapest first"""
+        if not key in config.keys():
+            continue
+        if isinstance(config[key], six.string_types):
+            predicates = [config[key]]
+        elif isinstance(config[key], (list,)):
+            predicates = config[key]
         else:
             return
-        for predicate in when:
-            if not ' ' in predicate:
-                if not hasattr(obj, predicate):
-                    return
-                if not test_when(predicate, True):
-                    return
-            else:
-                funcname, operator, complement = split_when(predicate)
-                if not hasattr(obj, funcname):
-                    return
-                if operator == "not found":
-                    return
-                if not test_when(funcname, True, operator, complement):
-                    return
-    if 'not when' in config.keys():
-        """Test not when predicate(s)"""
-        if isinstance(config['not when'], six.string_types):
-            nwhen = [config['not when']]
-            if not test_when(config['not when'],False):
+        for predicate in sorted(predicates, key=predicate_cost):
+            if evaluate_predicate(obj, predicate) is not expected:
                 return
-        elif isinstance(config['not when'], (list,)):
-            nwhen = config['not when']
-        else:
-            return
-        for predicate in nwhen:
-            if not ' ' in predicate:
-                if not test_when(predicate, False):
-                    return
-            else:
-                funcname, operator, complement = split_when(predicate)
-                if not test_when(funcname, False, operator, complement):
-                    return
     if 'label' in config.keys():
         return config['label']
     return ' '.join([x.capitalize() for x in funcname.split('_')])
@@ -335,6 +863,37 @@ def replace_widget_hard(cont, w1, w2):
             children[i] = w2
     cont.children = children
 
+def close_widget(w):
+    r"""
+    Close widget `w`, with its children, layout and style, so that they are
+    released in the kernel and in the browser. Shared layouts stay open.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import close_widget, live_widget_count
+        sage: n = live_widget_count()
+        sage: w = HBox([Label('a'), Button(description='b')])
+        sage: close_widget(w)
+        sage: live_widget_count() - n
+        0
+    """
+    for child in getattr(w, 'children', ()):
+        close_widget(child)
+    for attribute in ('layout', 'style'):
+        sub = getattr(w, attribute, None)
+        if isinstance(sub, Widget) and not any(sub is layout for layout in shared_layouts):
+            sub.close()
+    w.close()
+
+def live_widget_count():
+    r"""
+    Return the number of widgets alive in the kernel.
+    """
+    try:
+        from ipywidgets.widgets.widget import _instances
+    except ImportError: # ipywidgets 7
+        _instances = Widget.widgets
+    return len(_instances)
+
 def replace_widget_w_css(w1, w2):
     """Replace widget w1 with widget w2"""
     w1.remove_class('visible')
@@ -352,11 +911,668 @@ class Title(Label):
         self.value = value
         self.add_class('title-level%d' % level)
 
+def function_key(func):
+    r"""
+    Return a key identifying function or method `func` across sessions,
+    or None: its module and qualified name.
+
+    Local functions, such as decorator wrappers, and lambdas share their
+    qualified name with other functions: they get no key.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import function_key
+        sage: from sage.combinat.partition import Partition
+        sage: function_key(Partition.add_cell)
+        ('sage.combinat.partition', 'Partition.add_cell')
+        sage: function_key(Integer.factor)
+        ('sage.rings.integer', 'Integer.factor')
+        sage: function_key(lambda x: x) is None
+        True
+    """
+    module = getattr(func, '__module__', None) or getattr(getattr(func, '__objclass__', None), '__module__', None)
+    qualname = getattr(func, '__qualname__', None)
+    if not isinstance(module, str) or not isinstance(qualname, str):
+        return
+    if '<locals>' in qualname or '<lambda>' in qualname:
+        return
+    return (module, qualname)
+
+argspecs = ObjectCache('function_argspecs', maxsize=4096) # Argspecs by function, in memory
+
+def cached_argspec(func):
+    r"""
+    Return the pair (args, defaults) for function or method `func`,
+    or (None, None) if its argspec cannot be determined.
+
+    Results, failures included, are cached in memory by function
+    and persisted on disk by module and qualified name.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import cached_argspec
+        sage: from sage.combinat.partition import Partition
+        sage: cached_argspec(Partition.add_cell)
+        (['self', 'i', 'j'], (None,))
+        sage: cached_argspec(42)
+        (None, None)
+
+    Local functions sharing a qualified name keep their own argspecs::
+
+        sage: def make_wrapper(n):
+        ....:     if n == 2:
+        ....:         def wrapper(x, y): pass
+        ....:     else:
+        ....:         def wrapper(z): pass
+        ....:     return wrapper
+        sage: f, g = make_wrapper(2), make_wrapper(1)
+        sage: from sage_explorer.sage_explorer import function_key
+        sage: function_key(f), cached_argspec(f), cached_argspec(g)
+        (None, (['x', 'y'], None), (['z'], None))
+    """
+    result = argspecs.get(func)
+    if result is not None:
+        return result
+    key = function_key(func)
+    result = None
+    if key:
+        result = argspecs_cache.get(key)
+    if result is None:
+        args, defaults = None, None
+        try:
+            argspec = getargspec(func)
+            args = getattr(argspec, 'args', None)
+            defaults = getattr(argspec, 'defaults', None)
+        except:
+            pass
+        result = (args, defaults)
+        if key:
+            argspecs_cache[key] = result
+    argspecs.set(func, result)
+    return result
+
+class Uncomputed(object):
+    r"""
+    The value of member fields that have not been computed yet.
+    It is false, as None, but distinct from None,
+    which is a legitimate computed value.
+    """
+    __slots__ = ()
+    def __repr__(self):
+        return '<uncomputed>'
+    def __bool__(self):
+        return False
+    __nonzero__ = __bool__
+
+UNCOMPUTED = Uncomputed()
+
+def kernel_loop():
+    r"""
+    Return the event loop of the running IPython kernel,
+    or None outside of a kernel.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import kernel_loop
+        sage: kernel_loop() is None
+        True
+    """
+    try:
+        return get_ipython().kernel.io_loop
+    except Exception:
+        return None
+
+class Debouncer(object):
+    r"""
+    Call `function` only once a burst of calls is over:
+    each call cancels the pending one, and schedules a new one
+    `delay` seconds later. With no delay, calls are immediate.
+
+    Calls are made in a timer thread; with `kernel`, they are
+    scheduled instead on the event loop of the IPython kernel, if any,
+    so that they run in the main thread, between two kernel messages:
+    this is required for functions writing widgets.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import Debouncer
+        sage: calls = []
+        sage: d = Debouncer(calls.append, delay=0.1)
+        sage: for i in range(5):
+        ....:     d(i)
+        sage: sleep(0.3)
+        sage: calls
+        [4]
+    """
+    def __init__(self, function, delay=0.2, kernel=False):
+        self.function = function
+        self.delay = delay
+        self.kernel = kernel
+        self.timer = None
+        self.loop = None # The kernel event loop of the pending call, if any
+
+    def __call__(self, *args):
+        self.cancel()
+        if not self.delay:
+            self.function(*args)
+            return
+        loop = kernel_loop() if self.kernel else None
+        if loop is not None:
+            self.loop = loop
+            self.timer = loop.call_later(self.delay, self.function, *args)
+            return
+        self.timer = threading.Timer(self.delay, self.function, args)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def cancel(self):
+        r"""
+        Cancel the pending call, if any.
+        """
+        if self.loop is not None:
+            self.loop.remove_timeout(self.timer)
+        elif self.timer:
+            self.timer.cancel()
+        self.timer = None
+        self.loop = None
+
+class Prefetcher(object):
+    r"""
+    Prepare the explorer page data of objects likely to be explored next,
+    in a background thread, while the user is idle (see :func:`page_data_steps`).
+
+    Prefetching starts `delay` seconds after being scheduled, runs for at
+    most `budget` seconds, and stops as soon as the in-memory caches use
+    more than `memory_fraction` of their memory budget, so that it never
+    evicts data of pages actually visited. It is stopped, at the end of
+    its current step, by any new schedule or stop. Since no alarm can
+    interrupt a background thread, and Sage is not thread-safe, steps
+    never call methods of the objects: property values are only
+    loaded from the persistent cache, and are otherwise left to the
+    main thread.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import Prefetcher, compute_page_data
+        sage: from sage_explorer._cache import property_cache
+        sage: _ = compute_page_data(Partition([5,3,2]))
+        sage: p, q = Partition([5,3,2]), Partition([6,1])
+        sage: prefetcher = Prefetcher(delay=0.1)
+        sage: prefetcher.schedule([p]); sleep(3)
+        sage: property_cache.get(p)['conjugate']
+        [3, 3, 2, 1, 1]
+        sage: prefetcher.schedule([q]); prefetcher.stop(); sleep(0.5)
+        sage: property_cache.get(q) is None
+        True
+    """
+    def __init__(self, delay=1.0, budget=5.0, memory_fraction=0.75):
+        self.delay = delay
+        self.budget = budget
+        self.memory_fraction = memory_fraction
+        self.generation = 0 # Changed by each schedule or stop, to stop running work
+        self.debouncer = Debouncer(self.run, delay=delay)
+        self.pages = 0 # Number of pages prefetched so far
+
+    def schedule(self, objects):
+        r"""
+        Prefetch the pages of `objects`, in order, once `delay` seconds
+        have passed without another schedule or stop.
+
+        Their keys in the persistent caches are computed at once,
+        in the calling thread, since this pickles them.
+        """
+        self.stop()
+        self.debouncer([(obj, object_key(obj)) for obj in objects], self.generation)
+
+    def stop(self):
+        r"""
+        Stop prefetching.
+        """
+        self.debouncer.cancel()
+        self.generation += 1
+
+    def run(self, objects, generation):
+        r"""
+        Prefetch the pages of `objects`, pairs (object, key), as long as
+        `generation` is current and the budgets allow it.
+        """
+        deadline = time.time() + self.budget
+        for obj, key in objects:
+            for _ in page_data_steps(obj, key):
+                if generation != self.generation or time.time() > deadline \
+                   or cache_registry.size() > self.memory_fraction * cache_registry.maxbytes:
+                    return
+            self.pages += 1
+
+class NameIndex(object):
+    r"""
+    An index of names, for fast substring search:
+    each trigram of a name points to the positions of names containing it.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import NameIndex
+        sage: index = NameIndex(['add_cell', 'conjugate', 'cells', 'arm_length'])
+        sage: index.search('cel')
+        ['add_cell', 'cells']
+        sage: index.search('Ce'), index.search('')
+        (['add_cell', 'cells'], ['add_cell', 'conjugate', 'cells', 'arm_length'])
+    """
+    def __init__(self, names):
+        self.names = list(names)
+        self.lowered = [name.lower() for name in self.names]
+        self.trigrams = {}
+        for i, name in enumerate(self.lowered):
+            for j in range(len(name) - 2):
+                self.trigrams.setdefault(name[j:j+3], set()).add(i)
+
+    def search(self, query):
+        r"""
+        Return the names containing `query`, case insensitively, in index order.
+        """
+        query = query.lower()
+        if len(query) < 3:
+            candidates = range(len(self.names))
+        else:
+            postings = []
+            for j in range(len(query) - 2):
+                posting = self.trigrams.get(query[j:j+3])
+                if not posting:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+            candidates = sorted(postings[0].intersection(*postings[1:]))
+        return [self.names[i] for i in candidates if query in self.lowered[i]]
+
+class MemberBrowser(HBox):
+    r"""A menu of members, sorted in sections
+
+    The full list of lines stays in the kernel: only a window of `rows`
+    lines is sent to the browser, whatever the number of members.
+    A vertical slider scrolls the window.
+    The selected member, if any, is the value of the browser.
+
+    Lines can be filtered by a substring of their labels, looked up in
+    a :class:`NameIndex`; sections without matching lines are hidden.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import MemberBrowser
+        sage: b = MemberBrowser(rows=3)
+        sage: b.set_sections([('A', [('a%d' % i, i) for i in range(100)]), ('B', [('b', 'b')])])
+        sage: b.select.options
+        (('— A —', 0), ('a0', 1), ('a1', 2))
+        sage: b.scroll_to(1000)
+        sage: b.offset, b.select.options
+        (100, (('a99', 100), ('— B —', 101), ('b', 102)))
+        sage: b.select.value = 102
+        sage: b.value
+        'b'
+        sage: b.set_filter('9')
+        sage: b.select.options
+        (('— A —', 0), ('a9', 1), ('a19', 2))
+        sage: len(b.lines), b.value
+        (20, 'b')
+    """
+    value = Any(None, allow_none=True)
+
+    def __init__(self, rows=12):
+        super(MemberBrowser, self).__init__()
+        self.rows = rows
+        self.all_lines = [] # pairs (label, value), value being None for section titles
+        self.lines = [] # lines matching the filter
+        self.index = None
+        self.query = ''
+        self.offset = 0
+        self.selected = None # position of the selected line
+        self.updating = False
+        self.select = Select(rows=rows)
+        self.scrollbar = IntSlider(min=0, max=0, value=0, orientation='vertical', readout=False,
+                                   layout=Layout(height='%.1fem' % (1.5 * rows)))
+        self.select.observe(self.select_on_change, names='value')
+        self.scrollbar.observe(self.scrollbar_on_change, names='value')
+        self.children = [self.select, self.scrollbar]
+
+    def set_sections(self, sections, index=None):
+        r"""
+        Fill the browser with `sections`, a list of pairs
+        (title, list of pairs (label, value)).
+        Labels are filtered with `index`, if given, else with
+        an index built on demand.
+        """
+        lines = []
+        for title, items in sections:
+            lines.append((u'\u2014 %s \u2014' % title, None))
+            lines.extend(items)
+        self.set_lines(lines, index)
+
+    def set_lines(self, lines, index=None):
+        r"""
+        Fill the browser with `lines`, pairs (label, value).
+        """
+        self.all_lines = lines
+        self.index = index
+        self.value = None
+        self.apply_filter()
+
+    def set_filter(self, query):
+        r"""
+        Only show lines whose label contains `query`.
+        """
+        self.query = query
+        self.apply_filter()
+
+    def apply_filter(self):
+        r"""
+        Compute the lines matching the current filter, and show the first ones.
+        """
+        if not self.query:
+            self.lines = self.all_lines
+        else:
+            if self.index is None:
+                self.index = NameIndex([label for label, value in self.all_lines if value is not None])
+            matches = set(self.index.search(self.query))
+            self.lines, title = [], None
+            for line in self.all_lines:
+                if line[1] is None:
+                    title = line
+                elif line[0] in matches:
+                    if title:
+                        self.lines.append(title)
+                        title = None
+                    self.lines.append(line)
+        self.selected = None
+        if self.value is not None:
+            for i, (label, value) in enumerate(self.lines):
+                if value is self.value:
+                    self.selected = i
+                    break
+        self.scroll_to(0)
+
+    def scroll_to(self, offset):
+        r"""
+        Show the window of lines starting at `offset`.
+        """
+        top = max(0, len(self.lines) - self.rows)
+        self.offset = offset = max(0, min(offset, top))
+        window = self.lines[offset:offset + self.rows]
+        options = tuple((label, i) for i, (label, _) in enumerate(window, offset))
+        self.updating = True
+        try:
+            if options != self.select.options: # Only send changed windows
+                self.select.options = options
+            if self.selected is not None and offset <= self.selected < offset + self.rows:
+                self.select.value = self.selected
+            else:
+                self.select.value = None
+            self.scrollbar.max = top
+            self.scrollbar.value = top - offset
+            if top:
+                self.scrollbar.remove_class('invisible')
+            else:
+                self.scrollbar.add_class('invisible')
+        finally:
+            self.updating = False
+
+    def select_on_change(self, change):
+        if self.updating or change.new is None:
+            return
+        value = self.lines[change.new][1]
+        if value is None: # A section title
+            return
+        self.selected = change.new
+        self.value = value
+
+    def scrollbar_on_change(self, change):
+        if self.updating:
+            return
+        self.scroll_to(self.scrollbar.max - change.new)
+
+def is_enumerated_parent(obj):
+    r"""
+    Test whether `obj` is a Sage parent whose elements can be enumerated.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import is_enumerated_parent
+        sage: is_enumerated_parent(Partitions(5)), is_enumerated_parent(NN)
+        (True, True)
+        sage: is_enumerated_parent(Partition([2,1])), is_enumerated_parent(Partitions), is_enumerated_parent(RR)
+        (False, False, False)
+    """
+    if EnumeratedSets is None or isclass(obj):
+        return False
+    try:
+        return obj in EnumeratedSets()
+    except Exception:
+        return False
+
+class ElementCursor(object):
+    r"""
+    An iterator over the elements of `parent`, with the number of
+    elements taken from it so far, and a lock held while taking them.
+    """
+    def __init__(self, parent):
+        self.parent = parent
+        self.iterator = None
+        self.position = 0
+        self.lock = threading.Lock()
+
+class ElementBrowser(VBox):
+    r"""Browse the elements of an enumerated parent, by pages
+
+    Elements are taken from the iterator of the parent, `page_size`
+    at a time, in a background thread, so that the kernel is not
+    blocked by costly or infinite iterations. While a page is shown,
+    the next one is prefetched. At most `max_pages` pages are kept:
+    pages dropped from there are computed again, from a new iterator,
+    when needed. Each parent has its own iterator and lock, so that
+    a new parent is not waiting for the elements of the previous one.
+    Clicking on an element makes it the value of the browser.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import ElementBrowser
+        sage: b = ElementBrowser(page_size=3, max_pages=2)
+        sage: b.set_parent(Partitions(4)); b.wait()
+        sage: [button.description for button in b.buttons]
+        ['[4]', '[3, 1]', '[2, 2]']
+        sage: b.show_page(1); b.wait()
+        sage: [button.description for button in b.buttons if button.layout.display != 'none']
+        ['[2, 1, 1]', '[1, 1, 1, 1]']
+        sage: b.status.value, b.nextbutton.disabled
+        ('Elements 4 to 5 of 5', True)
+        sage: b.buttons[0].click()
+        sage: b.value
+        [2, 1, 1]
+        sage: b.set_parent(NN); b.show_page(1000); b.wait()
+        sage: b.buttons[0].description, sorted(b.pages)
+        ('3000', [1000, 1001])
+        sage: class Slow(Parent):
+        ....:     def __iter__(self):
+        ....:         while True:
+        ....:             sleep(10)
+        ....:             yield 0
+        sage: b.set_parent(Slow()); sleep(0.5)
+        sage: b.set_parent(Partitions(3)); sleep(0.5)
+        sage: [button.description for button in b.buttons if button.layout.display != 'none']
+        ['[3]', '[2, 1]', '[1, 1, 1]']
+    """
+    value = Any(None, allow_none=True)
+
+    def __init__(self, page_size=20, max_pages=8):
+        super(ElementBrowser, self).__init__()
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.parent_set = None
+        self.generation = 0 # Changed with the parent, to drop outdated computations
+        self.pages = OrderedDict() # page number -> list of elements, least recently shown first
+        self.page = 0
+        self.last_page = None # Known once the iterator is exhausted
+        self.error = None
+        self.cursor = None # The iterator over the elements of the parent, see ElementCursor
+        self.pages_lock = threading.Lock() # For the pages, held briefly
+        self.threads = []
+        self.status = Label()
+        self.previousbutton = Button(description='Previous', icon='arrow-left', layout=back_button_layout)
+        self.previousbutton.on_click(lambda b: self.show_page(self.page - 1))
+        self.nextbutton = Button(description='Next', icon='arrow-right', layout=back_button_layout)
+        self.nextbutton.on_click(lambda b: self.show_page(self.page + 1))
+        self.buttons = []
+        for i in range(page_size):
+            button = Button(layout=Layout(display='none'))
+            button.on_click(lambda b, i=i: self.select(i))
+            self.buttons.append(button)
+        self.elementsbox = Box(self.buttons, layout=Layout(flex_flow='row wrap'))
+        self.children = [Title('Elements', 2), HBox([self.previousbutton, self.status, self.nextbutton]),
+                         self.elementsbox]
+        self.layout.display = 'none'
+
+    def set_parent(self, parent):
+        r"""
+        Browse the elements of `parent`, or nothing if it is None.
+        """
+        with self.pages_lock:
+            self.generation += 1 # Running computations will stop at their next element
+            self.parent_set = parent
+            self.cursor = ElementCursor(parent)
+            self.pages = OrderedDict()
+            self.last_page = None
+            self.error = None
+        if parent is None:
+            self.layout.display = 'none'
+            return
+        self.layout.display = None
+        self.show_page(0)
+
+    def show_page(self, n):
+        r"""
+        Show page `n`, computing it in the background if needed,
+        and prefetch the next one.
+        """
+        if n < 0 or (self.last_page is not None and n > self.last_page):
+            return
+        self.page = n
+        if n in self.pages:
+            self.display(n)
+            self.start(self.generation, n, False)
+        else:
+            self.status.value = 'Computing elements...'
+            for button in self.buttons:
+                button.layout.display = 'none'
+            self.start(self.generation, n, True)
+
+    def start(self, generation, n, show):
+        r"""
+        Compute page `n` in a background thread, then display it if `show`,
+        then compute page `n+1`.
+        """
+        if not show and (n + 1 in self.pages or (self.last_page is not None and n >= self.last_page)):
+            return
+        self.threads = [t for t in self.threads if t.is_alive()]
+        thread = threading.Thread(target=self.work, args=(generation, n, show))
+        thread.daemon = True
+        self.threads.append(thread)
+        thread.start()
+
+    def work(self, generation, n, show):
+        self.fetch(generation, n)
+        if generation == self.generation and show and self.page == n:
+            self.display(n)
+        last_page = self.last_page
+        self.fetch(generation, n + 1)
+        if generation == self.generation and self.page == n and self.last_page != last_page:
+            self.display(n) # The next page turned out to be empty
+
+    def fetch(self, generation, n):
+        r"""
+        Compute the elements of page `n`, for parent generation `generation`.
+
+        The lock of the pages is only held to check the generation and
+        to store the page: elements are taken under the lock of the
+        cursor of the parent.
+        """
+        with self.pages_lock:
+            if generation != self.generation or n in self.pages:
+                return
+            if self.last_page is not None and n > self.last_page:
+                return
+            cursor = self.cursor
+        with cursor.lock:
+            if n in self.pages: # Computed meanwhile
+                return
+            start = n * self.page_size
+            elements, last_page, error = [], None, None
+            try:
+                if cursor.iterator is None or cursor.position > start:
+                    cursor.iterator = iter(cursor.parent)
+                    cursor.position = 0
+                while cursor.position < start + self.page_size:
+                    if generation != self.generation: # The parent changed meanwhile
+                        return
+                    element = next(cursor.iterator)
+                    cursor.position += 1
+                    if cursor.position > start:
+                        elements.append(element)
+            except StopIteration:
+                last_page = n if elements or not n else n - 1
+            except Exception as e:
+                last_page, error = n, "%s: %s" % (e.__class__.__name__, e)
+        with self.pages_lock:
+            if generation != self.generation:
+                return
+            if last_page is not None:
+                self.last_page, self.error = last_page, error
+            self.pages[n] = elements
+            while len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+
+    def display(self, n):
+        r"""
+        Show the elements of page `n`, which has been computed.
+        """
+        with self.pages_lock:
+            elements = self.pages.pop(n, None)
+            if elements is not None:
+                self.pages[n] = elements # Most recently shown
+        if elements is None: # Dropped meanwhile
+            self.show_page(n)
+            return
+        for button, element in zip(self.buttons, elements + [None] * self.page_size):
+            if element is None:
+                button.layout.display = 'none'
+            else:
+                button.description = truncate(str(element), 40)
+                button.tooltip = "Explore %s" % button.description
+                button.layout.display = None
+        start = n * self.page_size
+        if not elements:
+            self.status.value = 'No elements'
+        elif self.last_page == n:
+            self.status.value = 'Elements %d to %d of %d' % (start + 1, start + len(elements), start + len(elements))
+        else:
+            self.status.value = 'Elements %d to %d' % (start + 1, start + len(elements))
+        if self.error and self.last_page == n:
+            self.status.value += ' (%s)' % self.error
+        self.previousbutton.disabled = not n
+        self.nextbutton.disabled = self.last_page is not None and n >= self.last_page
+
+    def select(self, i):
+        r"""
+        Make the `i`-th element of the current page the value of the browser.
+        """
+        elements = self.pages.get(self.page, [])
+        if i < len(elements):
+            self.value = None
+            self.value = elements[i]
+
+    def wait(self):
+        r"""
+        Wait for the background computations to be over.
+        """
+        for thread in list(self.threads):
+            thread.join()
+
 class ExploredMember(object):
     r"""
     A member of the explored object: method, attribute ..
+
+    Fields are stored in slots; those not computed yet hold `UNCOMPUTED`.
+    Members from a class member table (see :func:`class_member_table`)
+    are shared by all objects of that class, and have no parent.
     """
-    vocabulary = ['name', 'member', 'parent', 'member_type', 'doc', 'origin', 'overrides', 'privacy', 'prop_label', 'args', 'defaults']
+    __slots__ = ('name', 'member', 'parent', 'member_type', 'doc', 'origin', 'overrides', 'privacy', 'prop_label', 'args', 'defaults')
 
     def __init__(self, name, **kws):
         r"""
@@ -370,15 +1586,36 @@ class ExploredMember(object):
             sage: m = ExploredMember('conjugate', parent=p)
             sage: m.name
             'conjugate'
+            sage: m.is_computed('parent'), m.is_computed('member')
+            (True, False)
+            sage: ExploredMember('conjugate', size=3)
+            Traceback (most recent call last):
+            ...
+            ValueError: Argument 'size' not in vocabulary.
         """
+        for field in self.__slots__:
+            setattr(self, field, UNCOMPUTED)
         self.name = name
-        for arg in kws:
-            try:
-                assert arg in self.vocabulary
-            except:
+        for arg in kws:
+            if arg == 'name' or not arg in self.__slots__:
                 raise ValueError("Argument '%s' not in vocabulary." % arg)
             setattr(self, arg, kws[arg])
 
+    def is_computed(self, field):
+        r"""
+        Test whether `field` has been computed (or given).
+
+        TESTS::
+            sage: from sage_explorer.sage_explorer import ExploredMember
+            sage: m = ExploredMember('conjugate', privacy=None)
+            sage: m.is_computed('privacy'), m.is_computed('origin')
+            (True, False)
+        """
+        return getattr(self, field) is not UNCOMPUTED
+
+    def __repr__(self):
+        return "ExploredMember(%r)" % self.name
+
     def compute_member(self, parent=None):
         r"""
         Get method or attribute value, given the name.
@@ -392,9 +1629,9 @@ class ExploredMember(object):
             sage: m.member
             <bound method Partitions_all_with_category.element_class.conjugate of [3, 3, 2, 1]>
         """
-        if hasattr(self, 'member') and not parent:
+        if self.is_computed('member') and not parent:
             return
-        if not parent and hasattr(self, 'parent'):
+        if not parent and self.is_computed('parent'):
             parent = self.parent
         if not parent:
             return
@@ -415,7 +1652,7 @@ class ExploredMember(object):
             sage: m.doc[:100]
             '\n        Return the conjugate partition of the partition ``self``. This\n        is also called the a'
         """
-        if hasattr(self, 'member'):
+        if self.is_computed('member'):
             self.doc = self.member.__doc__
         else:
             self.compute_member(parent)
@@ -432,10 +1669,17 @@ class ExploredMember(object):
             sage: m.compute_member_type()
             sage: assert 'method' in m.member_type
         """
-        if not hasattr(self, 'member'):
+        if not self.is_computed('member'):
             self.compute_member(parent)
-        if not hasattr(self, 'member'):
+        if not self.is_computed('member'):
             raise ValueError("Cannot determine the type of a non existent member.")
+        kind = lazy_kind(self.member)
+        if kind == 'cached_method':
+            self.member_type = kind
+            return
+        if kind:
+            self.member_type = "attribute (%s)" % kind
+            return
         m = re.match("<(type|class) '([.\w]+)'>", str(type(self.member)))
         if m and ('method' in m.group(2)):
             self.member_type = m.group(2)
@@ -491,7 +1735,7 @@ class ExploredMember(object):
               <class 'sage.categories.objects.Objects.element_class'>])
         """
         if not parent:
-            if not hasattr(self, 'parent'):
+            if not self.is_computed('parent'):
                 raise ValueError("Cannot compute origin without a parent.")
             parent = self.parent
         self.parent = parent
@@ -499,17 +1743,7 @@ class ExploredMember(object):
             parentclass = parent
         else:
             parentclass = parent.__class__
-        origin, overrides = parentclass, []
-        for c in parentclass.__mro__[1:]:
-            if not self.name in [x[0] for x in getmembers(c)]:
-                continue
-            for x in getmembers(c):
-                if x[0] == self.name:
-                    if x[1] == getattr(parentclass, self.name):
-                        origin = c
-                    else:
-                        overrides.append(c)
-        self.origin, self.overrides = origin, overrides
+        self.origin, self.overrides = member_origin(parentclass, self.name)
 
     def compute_argspec(self, parent=None):
         r"""
@@ -525,16 +1759,9 @@ class ExploredMember(object):
             sage: m.args, m.defaults
             (['self', 'i', 'j'], (None,))
         """
-        args = None
-        defaults = None
-        try:
-            argspec = getargspec(self.member)
-            if hasattr(argspec, 'args'):
-                self.args = argspec.args
-            if hasattr(argspec, 'defaults'):
-                self.defaults = argspec.defaults
-        except:
-            pass
+        args, defaults = cached_argspec(self.member)
+        if args is not None:
+            self.args, self.defaults = args, defaults
 
     def compute_property_label(self, config):
         r"""
@@ -552,92 +1779,326 @@ class ExploredMember(object):
         self.prop_label = None
         if not self.name in config.keys():
             return
-        if not hasattr(self, 'parent'):
+        if not self.is_computed('parent'):
             raise ValueError("Cannot compute property label without a parent.")
-        myconfig = config[self.name]
-        if 'isinstance' in myconfig.keys():
-            """Test isinstance"""
-            if not isinstance(self.parent, eval_in_main(myconfig['isinstance'])):
-                return
-        if 'not isinstance' in myconfig.keys():
-            """Test not isinstance"""
-            if isinstance(self.parent, eval_in_main(myconfig['not isinstance'])):
-                return
-        if 'in' in myconfig.keys():
-            """Test in"""
-            try:
-                if not self.parent in eval_in_main(myconfig['in']):
-                    return
-            except:
-                return # The error is : descriptor 'category' of 'sage.structure.parent.Parent' object needs an argument
-        if 'not in' in myconfig.keys():
-            """Test not in"""
-            if self.parent in eval_in_main(myconfig['not in']):
-                return
-        def test_when(funcname, expected, operator=None, complement=None):
-            if funcname == 'isclass': # FIXME Prendre les premières valeurs de obj.getmembers pour le test -> calculer cette liste avant ?
-                res = eval_in_main(funcname)(self.parent)
-            else:
-                res = getattr(self.parent, funcname)
-            if operator and complement:
-                res = operator(res, eval_in_main(complement))
-            return (res == expected)
-        def split_when(s):
-            when_parts = myconfig['when'].split()
-            funcname = when_parts[0]
-            if len(when_parts) > 2:
-                operatorsign, complement = when_parts[1], when_parts[2]
-            elif len(when_parts) > 1:
-                operatorsign, complement = when_parts[1][0], when_parts[1][1:]
-            if operatorsign in OPERATORS.keys():
-                operator = OPERATORS[operatorsign]
-            else:
-                operator = "not found"
-            return funcname, operator, complement
-        if 'when' in myconfig.keys():
-            """Test when predicate(s)"""
-            if isinstance(myconfig['when'], six.string_types):
-                when = [myconfig['when']]
-            elif isinstance(myconfig['when'], (list,)):
-                when = myconfig['when']
-            else:
-                return
-            for predicate in when:
-                if not ' ' in predicate:
-                    if not hasattr(self.parent, predicate):
-                        return
-                    if not test_when(predicate, True):
-                        return
-                else:
-                    funcname, operator, complement = split_when(predicate)
-                    if not hasattr(self.parent, funcname):
-                        return
-                    if operator == "not found":
-                        return
-                    if not test_when(funcname, True, operator, complement):
-                        return
-        if 'not when' in myconfig.keys():
-            """Test not when predicate(s)"""
-            if isinstance(myconfig['not when'], six.string_types):
-                nwhen = [myconfig['not when']]
-            if not test_when(myconfig['not when'],False):
-                return
-            elif isinstance(myconfig['not when'], (list,)):
-                nwhen = myconfig['not when']
-            else:
-                return
-            for predicate in nwhen:
-                if not ' ' in predicate:
-                    if not test_when(predicate, False):
-                        return
-                else:
-                    funcname, operator, complement = split_when(predicate)
-                    if not test_when(funcname, False, operator, complement):
-                        return
-        if 'label' in myconfig.keys():
-            self.prop_label = myconfig['label']
-        else:
-            self.prop_label = ' '.join([x.capitalize() for x in self.name.split('_')])
+        self.prop_label = property_label(self.parent, self.name, config)
+
+def class_key(c):
+    r"""
+    Return a key identifying class `c` across sessions.
+
+    Dynamic classes may share a name while having different mros,
+    so the key is made of the names of all classes in the mro.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import class_key
+        sage: from sage.combinat.partition import Partition
+        sage: class_key(Partition)[:2]
+        ('sage.combinat.partition.Partition', 'sage.combinat.partition_tuple.PartitionTuple')
+    """
+    return tuple("%s.%s" % (b.__module__, getattr(b, '__qualname__', b.__name__)) for b in getmro(c))
+
+def object_key(obj):
+    r"""
+    Return a key identifying object `obj` across sessions,
+    or None if `obj` cannot be pickled.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import object_key
+        sage: from sage.combinat.partition import Partition
+        sage: object_key(Partition([3,3,2,1])) == object_key(Partition([3,3,2,1]))
+        True
+        sage: object_key(Partition([3,3,2,1])) == object_key(Partition([3,3,2]))
+        False
+    """
+    try:
+        return (class_key(obj.__class__), hashlib.sha1(pickle.dumps(obj, protocol=2)).hexdigest())
+    except Exception:
+        return
+
+def class_member_index(c0):
+    r"""
+    Return the member index of class `c0`, computing it if not cached.
+
+    The index is a list of picklable tuples
+    (name, member type, origin, overrides, privacy, args, defaults)
+    where origin and overrides are positions in the mro of `c0`.
+    It is looked up in the introspection database, if one was built
+    for this Sage version, then in the persistent members cache.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import class_member_index
+        sage: from sage.combinat.partition import Partition
+        sage: index = class_member_index(Partition([3,3,2,1]).__class__)
+        sage: [x[2] for x in index if x[0] == 'add_cell']
+        [1]
+    """
+    key = class_key(c0)
+    index = introspection_db.get(key)
+    if index is not None:
+        return index
+    index = members_cache.get(key)
+    if index is not None:
+        return index
+    index = compute_member_index(c0)
+    members_cache[key] = index
+    return index
+
+def compute_member_index(c0):
+    r"""
+    Compute the member index of class `c0` by introspection.
+
+    See :func:`class_member_index`.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import compute_member_index, class_member_index
+        sage: from sage.combinat.partition import Partition
+        sage: c0 = Partition([3,3,2,1]).__class__
+        sage: compute_member_index(c0) == class_member_index(c0)
+        True
+    """
+    mro = getmro(c0)
+    index = []
+    if STATIC_INTROSPECTION:
+        members = getmembers_static(c0)
+    else:
+        members = getmembers(c0)
+    for name, member in members:
+        if lazy_kind(member) is None and (isabstract(member) or 'deprecated' in str(type(member)).lower()):
+            continue
+        m = ExploredMember(name, member=member, parent=c0)
+        m.compute_member_type()
+        m.compute_origin()
+        m.compute_privacy()
+        args, defaults = None, None
+        if 'method' in m.member_type:
+            m.compute_argspec()
+            if m.is_computed('args'):
+                args, defaults = m.args, m.defaults
+        index.append((name, m.member_type, mro.index(m.origin),
+                      tuple(mro.index(c) for c in m.overrides), m.privacy, args, defaults))
+    return index
+
+member_tables = ObjectCache('member_tables', maxsize=128) # Member tables by class
+
+def class_member_table(c0):
+    r"""
+    Return the member table of class `c0`: the list of its members,
+    built from its member index. The table is computed once per class,
+    and its members are shared by all objects of that class,
+    so that they do not hold any reference to these objects.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import class_member_table
+        sage: from sage.combinat.partition import Partition
+        sage: c0 = Partition([3,3,2,1]).__class__
+        sage: table = class_member_table(c0)
+        sage: table is class_member_table(Partition([5,3]).__class__)
+        True
+        sage: [(m.origin, m.is_computed('parent')) for m in table if m.name == 'conjugate']
+        [(<class 'sage.combinat.partition.Partition'>, False)]
+    """
+    table = member_tables.get(c0)
+    if table is not None:
+        return table
+    mro = getmro(c0)
+    table = []
+    for name, member_type, origin, overrides, privacy, args, defaults in class_member_index(c0):
+        try:
+            member = getattr_member(c0, name)
+        except AttributeError:
+            continue
+        m = ExploredMember(name, member=member, member_type=member_type,
+                           origin=mro[origin], overrides=[mro[i] for i in overrides], privacy=privacy)
+        if args is not None:
+            m.args, m.defaults = args, defaults
+        table.append(m)
+    member_tables.set(c0, table)
+    return table
+
+name_indexes = ObjectCache('name_indexes', maxsize=128) # Member name indexes by class
+
+def class_name_index(c0):
+    r"""
+    Return the index of the names of members of class `c0`, for filtering menus.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import class_name_index
+        sage: from sage.combinat.partition import Partition
+        sage: 'add_cell' in class_name_index(Partition).search('add_c')
+        True
+    """
+    index = name_indexes.get(c0)
+    if index is not None:
+        return index
+    index = NameIndex([m.name for m in class_member_table(c0)])
+    name_indexes.set(c0, index)
+    return index
+
+def get_explored_members(obj):
+    r"""
+    Return the list of members for object `obj`: the member table of its class.
+    """
+    if isclass(obj):
+        return class_member_table(obj)
+    return class_member_table(obj.__class__)
+
+def property_labels(obj, members, config=None):
+    r"""
+    Compute which of `members` are properties of object `obj`.
+
+    OUTPUT: a dictionary member name -> property label
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import get_explored_members, property_labels
+        sage: from sage.combinat.partition import Partition
+        sage: p = Partition([3,3,2,1])
+        sage: labels = property_labels(p, get_explored_members(p))
+        sage: labels['conjugate'], 'add_cell' in labels
+        ('Conjugate', False)
+    """
+    if config is None:
+        config = CONFIG_PROPERTIES
+    labels = {}
+    for m in members:
+        if not m.name in config:
+            continue
+        label = property_label(obj, m.name, config)
+        if label:
+            labels[m.name] = label
+    return labels
+
+def property_values(obj, properties):
+    r"""
+    Compute the values of members `properties` for object `obj`.
+
+    Values of objects seen during the session are kept in memory,
+    so that revisiting them does not call any property method;
+    values are also looked up in and stored to the persistent properties cache.
+
+    OUTPUT: a dictionary member name -> value
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import get_explored_members, property_values
+        sage: from sage.combinat.partition import Partition
+        sage: p = Partition([3,3,2,1])
+        sage: property_values(p, [m for m in get_explored_members(p) if m.name == 'conjugate'])
+        {'conjugate': [4, 3, 2]}
+        sage: from sage_explorer._cache import property_cache
+        sage: property_cache.get(p)
+        {'conjugate': [4, 3, 2]}
+    """
+    values = property_cache.get(obj)
+    if values is not None and all(p.name in values for p in properties):
+        return values
+    key = object_key(obj)
+    if key and values is None:
+        values = properties_cache.get(key)
+    values = dict(values or {})
+    missing = False
+    for p in properties:
+        if p.name in values:
+            continue
+        try:
+            values[p.name] = p.member(obj)
+        except:
+            print ("Warning: Error in finding method %s" % p.name)
+            values[p.name] = None
+        missing = True
+    if key and missing:
+        properties_cache[key] = values
+    property_cache.set(obj, values)
+    return values
+
+def is_menu_member(m, prop_labels):
+    r"""
+    Test whether member `m` is to be listed in the menus,
+    and not as a property (according to `prop_labels`, see :func:`property_labels`).
+    """
+    return not m.name in prop_labels and not m.name in EXCLUDED_MEMBERS and not m.privacy in ['private', 'sage_special']
+
+def group_by_origin(c0, members):
+    r"""
+    Sort members by the class of the mro of `c0` where they are defined.
+
+    OUTPUT: a list of pairs (class, list of members), classes without members being omitted
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import get_explored_members, group_by_origin
+        sage: from sage.combinat.partition import Partition
+        sage: p = Partition([3,3,2,1])
+        sage: sections = group_by_origin(p.__class__, [m for m in get_explored_members(p) if m.name in ['add_cell', 'conjugate']])
+        sage: [(c, [m.name for m in section]) for c, section in sections]
+        [(<class 'sage.combinat.partition.Partition'>, ['add_cell', 'conjugate'])]
+    """
+    basemembers = {}
+    for c in getmro(c0):
+        basemembers[c] = []
+    for m in members:
+        basemembers[m.origin].append(m)
+    return [(c, basemembers[c]) for c in getmro(c0) if basemembers[c]]
+
+def compute_page_data(obj):
+    r"""
+    Compute the data of the explorer page for object `obj`,
+    without building any widget: the member index of its class,
+    its property values and the rendered docs.
+    All of them are stored into the persistent caches.
+
+    OUTPUT: a dictionary with keys 'members', 'properties' and 'docs'
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import compute_page_data
+        sage: from sage.combinat.partition import Partition
+        sage: data = compute_page_data(Partition([3,3,2,1]))
+        sage: data['properties']['conjugate']
+        [4, 3, 2]
+    """
+    members = get_explored_members(obj)
+    labels = property_labels(obj, members)
+    properties = property_values(obj, [m for m in members if m.name in labels])
+    docs = [doc_to_html(obj.__doc__)]
+    for m in members:
+        if 'method' in m.member_type and is_menu_member(m, labels):
+            docs.append(doc_to_html(m.member.__doc__))
+    return {'members': len(members), 'properties': properties, 'docs': len(docs)}
+
+def page_data_steps(obj, key):
+    r"""
+    Iterate over the steps of preparing the data of the explorer page
+    for object `obj` which is cheap and safe to compute in a background
+    thread: the member index of its class, its property values already
+    in the persistent cache under `key` (its :func:`object_key`, computed
+    by the caller in the main thread), and the rendered docs. No method
+    of `obj` is called, so that no alarm is needed. Each step is done when the
+    next item is asked for, so that the work can be stopped between steps.
+
+    TESTS::
+        sage: from sage_explorer.sage_explorer import page_data_steps, compute_page_data, object_key
+        sage: from sage_explorer._cache import property_cache
+        sage: _ = compute_page_data(Partition([4,1]))
+        sage: p = Partition([4,1])
+        sage: steps = page_data_steps(p, object_key(p))
+        sage: next(steps); next(steps)
+        sage: property_cache.get(p)['conjugate']
+        [2, 1, 1, 1]
+        sage: len(list(steps)) > 1
+        True
+    """
+    members = get_explored_members(obj)
+    yield
+    if key and property_cache.get(obj) is None:
+        values = properties_cache.get(key)
+        if values is not None:
+            property_cache.set(obj, dict(values))
+    yield
+    doc_to_html(obj.__doc__)
+    yield
+    for m in members:
+        if 'method' in m.member_type and not m.name in EXCLUDED_MEMBERS \
+           and not m.privacy in ['private', 'sage_special']:
+            doc_to_html(m.member.__doc__)
+            yield
 
 def make_catalog_menu_options(catalog):
     r"""Turn catalog into usable menu options
@@ -678,8 +2139,13 @@ class SageExplorer(VBox):
 
     value = Any()
 
-    def __init__(self, obj=None):
+    def __init__(self, obj=None, cache_results=False, prefetch=True):
         """
+        With `cache_results`, results of method calls are kept,
+        by object, method and arguments, and reused.
+        With `prefetch`, the pages of property values are prepared
+        in the background while the user is idle (see :class:`Prefetcher`).
+
         TESTS::
 
             sage: from sage_explorer.sage_explorer import SageExplorer
@@ -688,23 +2154,37 @@ class SageExplorer(VBox):
             sage: widget = SageExplorer(t)
         """
         super(SageExplorer, self).__init__()
+        self.cache_results = cache_results
+        self.prefetcher = Prefetcher() if prefetch else None
         self.title = Title()
         self.propsbox = VBox() # Will be a VBox full of HBoxes, one for each property
+        self.elements = ElementBrowser() # For enumerated parents
+        self.elements.observe(self.element_on_change, names='value')
         self.titlebox = VBox()
         self.titlebox.add_class('titlebox')
-        self.titlebox.children = [self.title, self.propsbox]
+        self.titlebox.children = [self.title, self.propsbox, self.elements]
         self.visualbox = Box()
         self.visualtext = Textarea('', rows=8)
         self.visualwidget = None
         self.visualbox.add_class('visualbox')
         self.visualbox.children = [self.visualtext]
         self.top = HBox([self.titlebox, self.visualbox], layout=justified_h_layout)
-        self.menus = Accordion(selected_index=None)
-        self.menusbox = VBox([Title("Menus", 2), self.menus])
+        self.menus = MemberBrowser(rows=12)
+        self.menus.observe(self.menu_on_change, names='value')
+        self.selection_generation = 0 # Counts menu selections, to drop outdated work
+        self.selection_debouncer = Debouncer(self.describe_selected_func, delay=0.15, kernel=True)
+        self.filterbox = Text(placeholder='Filter', continuous_update=True)
+        self.filter_debouncer = Debouncer(self.menus.set_filter, delay=0.15)
+        self.filterbox.observe(self.filterbox_on_change, names='value')
+        self.menusbox = VBox([Title("Menus", 2), self.filterbox, self.menus])
         self.inputs = HBox()
         self.gobutton = Button(description='Run!', tooltip='Run the function or method, with specified arguments')
         self.output = HTML()
-        self.worktab = VBox((self.inputs, self.gobutton, self.output))
+        self.output_stream = None # For outputs shown by pages
+        self.morebutton = Button(description='More', tooltip='Show more elements of the output')
+        self.morebutton.on_click(lambda b: self.show_more_output())
+        self.morebutton.add_class('invisible')
+        self.worktab = VBox((self.inputs, self.gobutton, self.output, self.morebutton))
         self.doc = HTML()
         self.doctab = HTML() # For the method docstring
         self.tabs = Tab((self.worktab, self.doctab)) # Will be used when a method is selected
@@ -718,9 +2198,91 @@ class SageExplorer(VBox):
         self.main.add_class('lightborder')
         self.titlebox.add_class('lightborder')
         self.children = (self.top, self.bottom)
+        self.owned = {} # Widgets created for the current page, by role, see own
+        self.gobutton.on_click(self.gobutton_on_click)
         self.history = []
         self.set_value(obj)
 
+    def interact(self):
+        r"""
+        Note a user interaction: stop prefetching.
+        """
+        if self.prefetcher:
+            self.prefetcher.stop()
+
+    def filterbox_on_change(self, change):
+        r"""
+        A callback for the filter box.
+        """
+        self.interact()
+        self.filter_debouncer(change.new)
+
+    def own(self, role, widgets):
+        r"""
+        Make `widgets` the widgets playing `role` on the page (properties,
+        inputs, visual ...), and close those that played it before,
+        since they are not displayed any more.
+
+        TESTS::
+            sage: from sage_explorer.sage_explorer import SageExplorer, live_widget_count
+            sage: p1, p2 = Partition([3,3,2,1]), Partition([5,3,2])
+            sage: e = SageExplorer(p1)
+            sage: e.set_value(p2); e.pop_value()
+            sage: n = live_widget_count()
+            sage: for i in range(500): # long time
+            ....:     e.set_value(p2)
+            ....:     e.pop_value()
+            sage: live_widget_count() - n
+            0
+        """
+        widgets = list(widgets)
+        for w in self.owned.get(role, []):
+            if not any(w is x for x in widgets):
+                close_widget(w)
+        self.owned[role] = widgets
+
+    def menu_on_change(self, change):
+        r"""
+        A callback for the menus: a member has been selected.
+
+        On object pages, the name and inputs of the selected method are
+        shown at once, and its documentation once the selection settles,
+        so that scrolling through the menu does not render the
+        documentation of every method on the way.
+
+        TESTS::
+            sage: from sage_explorer.sage_explorer import SageExplorer, ExploredMember
+            sage: p = Partition([3,3,2,1])
+            sage: e = SageExplorer(p)
+            sage: e.menus.value = ExploredMember('add_cell', parent=p)
+            sage: [i.description for i in e.inputs.children], e.doctab.value
+            (['i', 'j'], '<p class="resultinfo">add_cell</p>')
+            sage: e.menus.value = ExploredMember('conjugate', parent=p)
+            sage: sleep(1)
+            sage: str(e.doctab.value[:100])
+            '<div class="docstring">\n    \n  <blockquote>\n<div><p>Return the conjugate partition of the partition '
+        """
+        if change.new is None:
+            return
+        self.interact()
+        if self.value is None:
+            """We are on the catalogs page"""
+            self.selected_object = change.new
+            self.display_new_value(self.selected_object.name)
+            self.doctab.value = doc_to_html(change.new.doc)
+            return
+        self.selected_menu_value = change.new
+        self.selection_generation += 1
+        self.show_selected_func()
+        self.selection_debouncer(change.new, self.selection_generation)
+
+    def element_on_change(self, change):
+        r"""
+        A callback for the element browser: an element has been clicked.
+        """
+        if change.new is not None:
+            self.set_value(change.new)
+
     def init_selected_menu_value(self):
         r"""
         From a menu selection, compute display elements for the widgets.
@@ -741,25 +2303,25 @@ class SageExplorer(VBox):
             return
         """We are on the catalogs page"""
         selected_obj = self.selected_menu_value # An ExplorerMember
-        if not hasattr(selected_obj, 'member_type'):
+        if not selected_obj.is_computed('member_type'):
             selected_obj.compute_member_type()
-        if not hasattr(selected_obj, 'doc'):
+        if not selected_obj.is_computed('doc'):
             selected_obj.compute_doc()
         if 'function' in selected_obj.member_type or 'method' in selected_obj.member_type:
-            self.doctab.value = to_html(selected_obj.doc)
-            if not hasattr(selected_obj, 'args'):
+            self.doctab.value = doc_to_html(selected_obj.doc)
+            if not selected_obj.is_computed('args'):
                 try:
                     selected_obj.member = selected_obj.member()
                 except:
                     pass
-            elif hasattr(selected_obj, 'defaults') and len(selected_obj.defaults) == len(selected_obj.args):
+            elif selected_obj.is_computed('defaults') and len(selected_obj.defaults) == len(selected_obj.args):
                 try:
                     selected_obj.member = selected_obj.member(selected_obj.defaults)
                 except:
                     pass
             return
         if 'class' in selected_obj.member_type:
-            self.doc.value = to_html(selected_obj.doc)
+            self.doc.value = doc_to_html(selected_obj.doc)
             self.doctab.value = ''
             self.inputs.children = []
             self.tabs.remove_class('visible')
@@ -783,18 +2345,21 @@ class SageExplorer(VBox):
             sage: str(e.doctab.value[:100]) # For Python3 compatibility
             '<div class="docstring">\n    \n  <blockquote>\n<div><p>Return the conjugate partition of the partition '
         """
+        self.show_selected_func()
+        self.describe_selected_func(self.selected_menu_value, self.selection_generation)
+
+    def show_selected_func(self):
+        r"""
+        Show the name and the argument inputs of the selected method.
+        """
         self.output.value = ''
+        self.set_output_stream(None)
         func = self.selected_menu_value # An ExplorerMember
-        if not hasattr(func, 'doc'):
-            func.compute_doc()
-        if not hasattr(func, 'origin'):
-            func.compute_origin()
-        self.doctab.value = to_html(func.doc)
-        if func.overrides:
-            self.doctab.value += to_html("Overrides:")
-            self.doctab.value += to_html(', '.join([extract_classname(x, element_ok=True) for x in func.overrides]))
+        self.doctab.value = '<p class="resultinfo">%s</p>' % escape(func.name)
         inputs = []
-        if not hasattr(func, 'args'):
+        if not func.is_computed('member'):
+            func.compute_member()
+        if not func.is_computed('args'):
             func.compute_argspec()
         try:
             shift = 0
@@ -811,11 +2376,37 @@ class SageExplorer(VBox):
             print (func, "attr?")
             print (func.args, func.defaults)
         self.inputs.children = inputs
+        self.own('inputs', inputs)
         self.doc.remove_class('visible')
         self.doc.add_class('invisible')
         self.tabs.remove_class('invisible')
         self.tabs.add_class('visible')
 
+    def describe_selected_func(self, func, generation):
+        r"""
+        Show the documentation of method `func`, selected as selection
+        number `generation`, unless another one has been selected since.
+
+        This is called by the selection debouncer: in the main thread
+        in a kernel, else in a timer thread, whence the checks of the
+        generation before each step.
+        """
+        if generation != self.selection_generation:
+            return
+        if not func.is_computed('doc'):
+            func.compute_doc()
+        if not func.is_computed('origin'):
+            func.compute_origin()
+        if generation != self.selection_generation:
+            return
+        html = doc_to_html(func.doc)
+        if func.overrides:
+            html += to_html("Overrides:")
+            html += to_html(', '.join([extract_classname(x, element_ok=True) for x in func.overrides]))
+        if generation != self.selection_generation:
+            return
+        self.doctab.value = html
+
     def get_title(self):
         r"""
         Get explorer general title.
@@ -832,7 +2423,8 @@ class SageExplorer(VBox):
 
     def get_members(self):
         r"""
-        Get all members for object self.value.
+        Get all members for object self.value,
+        and the property labels of those which are properties.
 
         OUTPUT: List of `Member` named tuples.
 
@@ -846,7 +2438,7 @@ class SageExplorer(VBox):
             ('__class__', 'python_special')
             sage: e.members[68].name, e.members[68].origin, e.members[68].privacy
             ('_doccls', <class 'sage.combinat.partition.Partitions_all_with_category.element_class'>, 'private')
-            sage: e.members[112].name, e.members[112].overrides, e.members[112].prop_label
+            sage: e.members[112].name, e.members[112].overrides, e.prop_labels.get(e.members[112].name)
             ('_reduction',
              [<class 'sage.categories.infinite_enumerated_sets.InfiniteEnumeratedSets.element_class'>,
               <class 'sage.categories.enumerated_sets.EnumeratedSets.element_class'>,
@@ -863,17 +2455,8 @@ class SageExplorer(VBox):
         else:
             c0 = self.value.__class__
         self.valueclass = c0
-        members = []
-        for name, member in getmembers(c0):
-            if isabstract(member) or 'deprecated' in str(type(member)).lower():
-                continue
-            m = ExploredMember(name, member=member, parent=self.value)
-            m.compute_member_type()
-            m.compute_origin()
-            m.compute_privacy()
-            m.compute_property_label(CONFIG_PROPERTIES)
-            members.append(m)
-        self.members = members
+        self.members = get_explored_members(self.value)
+        self.prop_labels = property_labels(self.value, self.members)
 
     def get_attributes(self):
         r"""
@@ -891,7 +2474,7 @@ class SageExplorer(VBox):
             ('__class__', 'python_special')
             sage: e.attributes[30].name, e.attributes[30].origin, e.attributes[30].privacy
             ('_doccls', <class 'sage.combinat.partition.Partitions_all_with_category.element_class'>, 'private')
-            sage: e.attributes[33].name, e.attributes[33].overrides, e.attributes[33].prop_label
+            sage: e.attributes[33].name, e.attributes[33].overrides, e.prop_labels.get(e.attributes[33].name)
             ('_reduction',
              [<class 'sage.categories.infinite_enumerated_sets.InfiniteEnumeratedSets.element_class'>,
               <class 'sage.categories.enumerated_sets.EnumeratedSets.element_class'>,
@@ -900,7 +2483,7 @@ class SageExplorer(VBox):
               <class 'sage.categories.sets_with_partial_maps.SetsWithPartialMaps.element_class'>,
               <class 'sage.categories.objects.Objects.element_class'>],
              None)
-            sage: e.attributes[35].name, e.attributes[35].overrides, e.attributes[34].prop_label
+            sage: e.attributes[35].name, e.attributes[35].overrides, e.prop_labels.get(e.attributes[34].name)
             ('young_subgroup', [<class 'sage.combinat.partition.Partition'>], None)
         """
         if not hasattr(self, 'members'):
@@ -936,7 +2519,8 @@ class SageExplorer(VBox):
         for m in self.members:
             if not 'method' in m.member_type:
                 continue
-            m.compute_argspec()
+            if not m.is_computed('args'):
+                m.compute_argspec()
             methods.append(m)
         self.methods = methods
 
@@ -944,6 +2528,9 @@ class SageExplorer(VBox):
         """Get some properties, depending on the object
         Create links between menus and output tabs"""
         obj = self.value
+        self.interact()
+        self.selection_debouncer.cancel()
+        self.selection_generation += 1
         if obj is None:
             self.make_index()
             return
@@ -956,40 +2543,38 @@ class SageExplorer(VBox):
             self.get_members()
             self.get_attributes()
             self.get_methods()
+        else:
+            self.prop_labels = property_labels(obj, self.members)
         self.classname = extract_classname(c0, element_ok=False)
         self.title.value = self.get_title()
         replace_widget_w_css(self.tabs, self.doc)
         visualwidget = get_widget(obj)
         if visualwidget:
-            # Reset if necessary, then replace with visualbox
-            self.visualbox.children = [self.visualtext]
             self.visualwidget = visualwidget
             def graphical_change(change):
                 self.set_value(change.new)
             self.visualwidget.observe(graphical_change, names='value')
-            replace_widget_hard(self.visualbox, self.visualtext, self.visualwidget)
+            self.visualbox.children = [self.visualwidget]
+            self.own('visual', [self.visualwidget])
         else:
             try:
                 self.visualtext.value = repr(obj._ascii_art_())
             except:
                 self.visualtext.value = repr(obj)
-            if self.visualwidget:
-                replace_widget_hard(self.visualbox, self.visualwidget, self.visualtext)
-                self.visualwidget = None
-        attributes_as_properties = [m for m in self.attributes if m.prop_label]
-        methods_as_properties = [m for m in self.methods if m.prop_label]
-        attributes = [m for m in self.attributes if not m in attributes_as_properties and not m.name in EXCLUDED_MEMBERS and not m.privacy in ['private', 'sage_special']]
-        methods = [m for m in self.methods if not m in methods_as_properties and not m.name in EXCLUDED_MEMBERS and not m.privacy in ['private', 'sage_special']]
+            self.visualwidget = None
+            self.visualbox.children = [self.visualtext]
+            self.own('visual', [])
+        attributes_as_properties = [m for m in self.attributes if m.name in self.prop_labels]
+        methods_as_properties = [m for m in self.methods if m.name in self.prop_labels]
+        attributes = [m for m in self.attributes if is_menu_member(m, self.prop_labels)]
+        methods = [m for m in self.methods if is_menu_member(m, self.prop_labels)]
         props = [Title('Properties', 2)] # a list of HBoxes, to become self.propsbox's children
         # Properties
+        values = property_values(obj, attributes_as_properties + methods_as_properties)
         for p in attributes_as_properties + methods_as_properties:
-            try:
-                value = p.member(obj)
-            except:
-                print ("Warning: Error in finding method %s" % p.name)
-                value = None
+            value = values[p.name]
             button = self.make_new_page_button(value)
-            b_label = p.prop_label
+            b_label = self.prop_labels[p.name]
             if type(value) is type(True):
                 b_label += '?'
             else:
@@ -999,64 +2584,152 @@ class SageExplorer(VBox):
                 button
             ]))
         if len(self.history) > 1:
-            self.propsbox.children = props + [self.make_back_button()]
-        else:
-            self.propsbox.children = props
+            props.append(self.make_back_button())
+        self.propsbox.children = props
+        self.own('properties', props)
+        # Elements
+        self.elements.set_parent(obj if is_enumerated_parent(obj) else None)
         # Object doc
-        self.doc.value = to_html(obj.__doc__) # Initialize to object docstring
+        self.doc.value = doc_to_html(obj.__doc__) # Initialize to object docstring
         # Methods (sorted by definition classes)
         self.selected_menu_value = c0
-        bases = []
-        basemembers = {}
-        for c in getmro(c0):
-            bases.append(c)
-            basemembers[c] = []
-        for m in methods:
-            basemembers[m.origin].append(m.name)
-        for c in basemembers:
-            if not basemembers[c]:
-                bases.remove(c)
-        menus = []
-        for i in range(len(bases)):
-            c = bases[i]
-            menus.append(Select(rows=12, options = [(m.name, m) for m in methods if m.name in basemembers[c]]
-            ))
-        self.menus.children = menus
-        for i in range(len(bases)):
-            c = bases[i]
-            self.menus.set_title(i, extract_classname(c))
-        def menu_on_change(change):
-            self.selected_menu_value = change.new
-            self.init_selected_menu_value()
-        for menu in self.menus.children:
-            menu.observe(menu_on_change, names='value')
-        def compute_selected_method(button):
-            args = []
-            for i in self.inputs.children:
-                try:
-                    arg = i.value or i.placeholder
-                    evaled_arg = eval_in_main(arg)
-                    if not arg:
-                        self.output.value = to_html("Argument '%s' is empty!" % i.description)
-                        return
-                    args.append(evaled_arg)
-                except:
-                    self.output.value = to_html("Could not evaluate argument '%s'" % i.description)
+        self.menus.set_sections([(extract_classname(c), [(m.name, m) for m in section])
+                                 for c, section in group_by_origin(c0, methods)], class_name_index(c0))
+        self.gobutton.description = 'Run!'
+        # Prefetch the pages behind property buttons, once the page has settled
+        if self.prefetcher:
+            self.prefetcher.schedule([value for value in values.values()
+                                      if value is not None and type(value) is not type(True)])
+
+    def gobutton_on_click(self, button):
+        r"""
+        A callback for the 'Run!' button, which is the 'Go!' button
+        of the catalogs page.
+        """
+        self.interact()
+        if self.value is None:
+            """We are on the catalogs page"""
+            if self.selected_object is not None:
+                self.set_value(self.selected_object.member)
+            return
+        if not isinstance(self.selected_menu_value, ExploredMember):
+            return
+        args = []
+        for i in self.inputs.children:
+            try:
+                arg = i.value or i.placeholder
+                evaled_arg = eval_in_main(arg)
+                if not arg:
+                    self.output.value = to_html("Argument '%s' is empty!" % i.description)
                     return
+                args.append(evaled_arg)
+            except:
+                self.output.value = to_html("Could not evaluate argument '%s'" % i.description)
+                return
+        self.output.value = self.run_method(self.value, self.selected_menu_value, args)
+
+    def run_method(self, obj, func, args):
+        r"""
+        Call member `func` on object `obj` with arguments `args`,
+        and return the output as HTML.
+
+        If results are cached, and this call has already been done,
+        reuse its result; the output then tells so, and how long
+        the original call took.
+
+        TESTS::
+            sage: from sage_explorer.sage_explorer import SageExplorer, ExploredMember
+            sage: from sage.combinat.partition import Partition
+            sage: p = Partition([3,3,2,1])
+            sage: e = SageExplorer(p, cache_results=True)
+            sage: m = ExploredMember('add_cell', member=Partition.add_cell)
+            sage: e.run_method(p, m, [0])
+            '<p class="resultinfo">Computed in ...s</p>...'
+            sage: e.run_method(p, m, [0])
+            '<p class="resultinfo">Cached result, computed in ...s</p>...'
+            sage: e.run_method(p, m, [5])
+            '...is not an addable cell...'
+        """
+        key = None
+        self.set_output_stream(None)
+        if self.cache_results:
+            args_key = arguments_key(args)
+            if args_key is not None:
+                key = (func.name, args_key)
+                cached = result_cache.get(obj, subkey=key)
+                if cached is not None:
+                    out, seconds = cached
+                    return '<p class="resultinfo">Cached result, computed in %.3fs</p>' % seconds + self.output_html(out)
+        try:
+            start = time.time()
+            if AlarmInterrupt:
+                alarm(TIMEOUT)
             try:
-                if AlarmInterrupt:
-                    alarm(TIMEOUT)
-                out = self.selected_menu_value.member(obj, *args)
+                out = func.member(obj, *args)
+            finally:
                 if AlarmInterrupt:
                     cancel_alarm()
-            except AlarmInterrupt:
-                self.output.value = to_html("Timeout!")
-            except Exception as e:
-                self.output.value = to_html(e)
-                return
-            self.output.value = to_html(out)
-        self.gobutton.description = 'Run!'
-        self.gobutton.on_click(compute_selected_method)
+            seconds = time.time() - start
+        except INTERRUPTS:
+            return to_html("Timeout!")
+        except Exception as e:
+            return to_html(e)
+        if not self.cache_results:
+            return self.output_html(out)
+        if key is not None and not isinstance(out, Iterator): # Iterators can only be consumed once
+            result_cache.set(obj, (out, seconds), subkey=key)
+        return '<p class="resultinfo">Computed in %.3fs</p>' % seconds + self.output_html(out)
+
+    def output_html(self, out):
+        r"""
+        Return the HTML for method output `out`.
+
+        Large or lazy outputs are shown by pages of elements,
+        the next one being computed when the 'More' button is clicked.
+
+        TESTS::
+            sage: from sage_explorer.sage_explorer import SageExplorer
+            sage: e = SageExplorer(Partition([3,3,2,1]))
+            sage: e.output_html(x for x in NN)
+            '<p class="resultinfo">generator</p><ol class="output-elements" start="1"><li>0</li>...First 50 elements</p>'
+            sage: e.output.value = '...'; e.show_more_output()
+            sage: e.output.value
+            '...<ol class="output-elements" start="51"><li>50</li>...First 100 elements</p>'
+            sage: e.output_html(42)
+            '<div class="docstring">...42...'
+            sage: e.output_stream is None
+            True
+        """
+        elements = output_elements(out)
+        if elements is None:
+            self.set_output_stream(None)
+            return output_to_html(out)
+        self.set_output_stream(OutputStream(*elements))
+        html = self.output_stream.next_page()
+        self.set_output_stream(self.output_stream) # Hide the button if the stream is exhausted
+        return html
+
+    def set_output_stream(self, stream):
+        r"""
+        Set the stream of output elements, showing the 'More' button
+        if it has more elements.
+        """
+        self.output_stream = stream
+        if stream is None or stream.exhausted:
+            self.morebutton.remove_class('visible')
+            self.morebutton.add_class('invisible')
+        else:
+            self.morebutton.remove_class('invisible')
+            self.morebutton.add_class('visible')
+
+    def show_more_output(self):
+        r"""
+        Append the next page of output elements to the output.
+        """
+        if self.output_stream is None:
+            return
+        self.output.value += self.output_stream.next_page()
+        self.set_output_stream(self.output_stream)
 
     def make_back_button(self):
         r"""
@@ -1163,6 +2836,56 @@ class SageExplorer(VBox):
             self.value = None
         self.compute()
 
+    def export_html(self, directory, depth=1):
+        r"""
+        Export the current page as static HTML into `directory`,
+        with the pages reachable through property buttons up to `depth` levels.
+
+        TESTS::
+            sage: from sage_explorer.sage_explorer import SageExplorer
+            sage: from sage.combinat.partition import Partition
+            sage: e = SageExplorer(Partition([3,3,2,1]))
+            sage: e.export_html(tmp_dir())
+            '.../index.html'
+        """
+        from .export import export_html
+        return export_html(self.value, directory, depth)
+
+    def save_state(self, filename):
+        r"""
+        Save the history of the explorer into file `filename`, with the
+        data computed for its pages (see :mod:`sage_explorer.session`).
+
+        TESTS::
+            sage: from sage_explorer.sage_explorer import SageExplorer
+            sage: from sage.combinat.partition import Partition
+            sage: from sage.combinat.tableau import Tableau
+            sage: e = SageExplorer(Partition([3,3,2,1]))
+            sage: e.set_value(Tableau([[1,2,3,4], [5,6]]))
+            sage: filename = tmp_filename()
+            sage: e.save_state(filename)
+            sage: f = SageExplorer()
+            sage: f.load_state(filename)
+            sage: f.get_value(), f.history.unpickled
+            ([[1, 2, 3, 4], [5, 6]], 1)
+            sage: f.pop_value()
+            sage: f.get_value(), f.history.unpickled
+            ([3, 3, 2, 1], 2)
+        """
+        from .session import save_state
+        save_state([obj for obj in self.history if obj is not None], filename)
+
+    def load_state(self, filename):
+        r"""
+        Restore the history saved into file `filename` by :meth:`save_state`,
+        and show its last page. Previous pages are only loaded when visited.
+        """
+        from .session import load_state
+        self.interact()
+        self.history = load_state(filename)
+        self.value = self.history[-1] if self.history else None
+        self.compute()
+
     def make_index(self):
         try:
             from ._catalogs import catalogs
@@ -1170,22 +2893,33 @@ class SageExplorer(VBox):
             print("To build the index page, we need some catalogs.")
             catalogs = []
         self.selected_object = None
+        self.elements.set_parent(None)
         self.title.value = "Sage Explorer"
-        self.visualbox.children = [Title("Index Page")]
+        title = Title("Index Page")
+        self.visualwidget = None
+        self.visualbox.children = [title]
+        self.own('visual', [title])
+        self.own('properties', [])
+        self.own('inputs', [])
+        self.propsbox.children = []
+        self.inputs.children = []
         self.tabs.remove_class('invisible')
         self.tabs.add_class('visible')
         self.gobutton.description = 'Go!'
-        menus = []
-        for label, catalog in catalogs:
-            menu = Select(rows=12, options=make_catalog_menu_options(catalog))
-            menus.append(menu)
-        self.menus.children = menus
-        for i, (label, _) in enumerate(catalogs):
-            self.menus.set_title(i, label)
-        def menu_on_change(change):
-            self.selected_object = change.new
-            self.display_new_value(self.selected_object.name)
-            self.doctab.value = to_html(change.new.doc)
-            self.gobutton.on_click(lambda b:self.set_value(self.selected_object.member))
-        for menu in self.menus.children:
-            menu.observe(menu_on_change, names='value')
+        self.menus.set_sections([(label, make_catalog_menu_options(catalog)) for label, catalog in catalogs])
+
+def explore(obj=None, **kws):
+    r"""
+    Explore `obj`: open a :class:`SageExplorer` on it or, if `obj` is a list,
+    a table of the properties of its items (see :mod:`sage_explorer.table`).
+    Keyword arguments are passed to the explorer or table.
+
+    TESTS::
+        sage: from sage_explorer import explore
+        sage: explore(Partition([3,1])).__class__.__name__, explore([Partition([3,1])]).__class__.__name__
+        ('SageExplorer', 'TableExplorer')
+    """
+    if type(obj) is list:
+        from .table import TableExplorer
+        return TableExplorer(obj, **kws)
+    return SageExplorer(obj, **kws)
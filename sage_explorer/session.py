@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+r"""
+Saving and restoring explorer sessions
+
+Save the history of an explorer into one file, with the data computed for
+each page of it (property values, results of method calls and rendered
+docs), so that a session can be resumed after a kernel restart without
+computing its pages again.
+
+Each page is pickled separately, with protocol 5 where available; large
+buffers, such as those of NumPy arrays, are stored out of band, aligned,
+after the pickle. An index at the end of the file locates the pages.
+Loading maps the file in memory and only unpickles the last page: the
+others are unpickled when they are visited again, their out-of-band
+buffers being read from the mapped file without copy (NumPy arrays so
+restored are read-only).
+
+EXAMPLES::
+
+    sage: from sage_explorer import explore
+    sage: e = explore(Partition([3,3,2,1]))
+    sage: e.save_state('partitions.explorer')
+    sage: e = explore()
+    sage: e.load_state('partitions.explorer')
+"""
+import os, mmap, pickle, struct, tempfile, warnings
+from ._cache import SAGE_VERSION, docs_cache, property_cache, result_cache
+
+MAGIC = b'SAGE_EXPLORER_STATE\n'
+PROTOCOL = min(pickle.HIGHEST_PROTOCOL, 5)
+ALIGNMENT = 64 # Out-of-band buffers start at multiples of this offset
+TRAILER = struct.Struct('<Q') # Offset of the index, at the end of the file
+
+def page_docs(obj):
+    r"""
+    Return the docs of the explorer page of `obj` already rendered,
+    as a dictionary docstring -> html.
+
+    TESTS::
+        sage: from sage_explorer.session import page_docs
+        sage: from sage_explorer.sage_explorer import doc_to_html
+        sage: p = Partition([3,3,2,1])
+        sage: html = doc_to_html(p.__doc__)
+        sage: page_docs(p)[p.__doc__] == html
+        True
+    """
+    from .sage_explorer import get_explored_members, property_labels, is_menu_member
+    docs = [obj.__doc__]
+    try:
+        members = get_explored_members(obj)
+        labels = property_labels(obj, members)
+    except Exception:
+        members = []
+    for m in members:
+        if 'method' in m.member_type and is_menu_member(m, labels):
+            docs.append(m.member.__doc__)
+    result = {}
+    for doc in docs:
+        if doc:
+            html = docs_cache.get(doc)
+            if html is not None:
+                result[doc] = html
+    return result
+
+def page_state(obj):
+    r"""
+    Return the state saved for the page of `obj`: the object, and the
+    data cached for it during the session.
+    """
+    return {'object': obj,
+            'properties': property_cache.get(obj),
+            'results': result_cache.items(obj),
+            'docs': page_docs(obj)}
+
+def restore_page(state):
+    r"""
+    Put the data of page `state` back into the caches, and return its object.
+    """
+    obj = state['object']
+    if state.get('properties') is not None:
+        property_cache.set(obj, state['properties'])
+    for subkey, value in state.get('results', ()):
+        result_cache.set(obj, value, subkey=subkey)
+    for doc, html in state.get('docs', {}).items():
+        if docs_cache.get(doc) is None:
+            docs_cache[doc] = html
+    return obj
+
+def dump_page(state):
+    r"""
+    Pickle page `state`.
+
+    OUTPUT: the pickle, and the list of its out-of-band buffers
+    """
+    buffers = []
+    if PROTOCOL >= 5:
+        data = pickle.dumps(state, PROTOCOL, buffer_callback=buffers.append)
+    else:
+        data = pickle.dumps(state, PROTOCOL)
+    return data, [b.raw() for b in buffers]
+
+def save_state(history, filename):
+    r"""
+    Save the pages of `history`, a list of objects, into file `filename`.
+
+    Pages whose data cannot be pickled are saved with their object only;
+    pages whose object cannot be pickled are left out.
+
+    The file is written under a temporary name, then renamed: pages
+    loaded from it with :func:`load_state`, whose buffers are mapped from
+    it, can be saved into it again.
+
+    OUTPUT: the number of pages saved
+
+    TESTS::
+        sage: from sage_explorer.session import save_state, load_state
+        sage: filename = tmp_filename()
+        sage: save_state([Partition([3,3,2,1]), matrix(RDF, 2, [1,2,3,4]), lambda x: x], filename)
+        2
+        sage: history = load_state(filename)
+        sage: len(history), history.unpickled
+        (2, 0)
+        sage: history[-1]
+        [1.0 2.0]
+        [3.0 4.0]
+        sage: history[0], history.unpickled
+        ([3, 3, 2, 1], 2)
+        sage: import numpy
+        sage: save_state([numpy.arange(100000)], filename)
+        1
+        sage: save_state(list(load_state(filename)), filename)
+        1
+        sage: load_state(filename)[0][-1]
+        99999
+    """
+    index = []
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmpname = tempfile.mkstemp(prefix='.explorer-', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC)
+            for obj in history:
+                try:
+                    data, buffers = dump_page(page_state(obj))
+                except Exception:
+                    try:
+                        data, buffers = dump_page({'object': obj})
+                    except Exception:
+                        warnings.warn("Cannot save the page of %s" % repr(obj)[:80])
+                        continue
+                offset = f.tell()
+                f.write(data)
+                locations = []
+                for b in buffers:
+                    f.write(b'\0' * (-f.tell() % ALIGNMENT))
+                    locations.append((f.tell(), b.nbytes))
+                    f.write(b)
+                index.append((offset, len(data), locations))
+            position = f.tell()
+            pickle.dump({'sage_version': SAGE_VERSION, 'pages': index}, f, 2)
+            f.write(TRAILER.pack(position))
+        getattr(os, 'replace', os.rename)(tmpname, filename) # No os.replace in Python 2
+    except BaseException:
+        os.remove(tmpname)
+        raise
+    return len(index)
+
+class SavedHistory(list):
+    r"""
+    The history of an explorer, loaded from a file mapped in memory
+    (see :func:`load_state`).
+
+    Items are saved pages until they are accessed: their object is then
+    unpickled, and their data put back into the caches.
+    """
+    def __init__(self, pages, buffer):
+        super(SavedHistory, self).__init__(pages)
+        self.buffer = buffer
+        self.unpickled = 0
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        item = super(SavedHistory, self).__getitem__(i)
+        if isinstance(item, SavedPage):
+            item = item.load(self.buffer)
+            self.unpickled += 1
+            super(SavedHistory, self).__setitem__(i, item)
+        return item
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+class SavedPage(object):
+    r"""
+    The location of a page in a state file (see :func:`save_state`).
+    """
+    __slots__ = ('offset', 'length', 'buffers')
+
+    def __init__(self, offset, length, buffers):
+        self.offset = offset
+        self.length = length
+        self.buffers = buffers
+
+    def load(self, buffer):
+        r"""
+        Unpickle the page from `buffer`, restore its data and return its object.
+        """
+        data = buffer[self.offset:self.offset + self.length]
+        if PROTOCOL >= 5:
+            view = memoryview(buffer)
+            state = pickle.loads(data, buffers=[view[offset:offset + n] for offset, n in self.buffers])
+        else:
+            state = pickle.loads(data)
+        return restore_page(state)
+
+def load_state(filename):
+    r"""
+    Load the history saved into file `filename` by :func:`save_state`.
+
+    Only the index of the file is read: pages are unpickled on access.
+
+    OUTPUT: a :class:`SavedHistory`
+    """
+    with open(filename, 'rb') as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, mmap.error): # Empty file
+            buffer = b''
+    if buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError("%s is not a saved explorer state" % filename)
+    position, = TRAILER.unpack(buffer[-TRAILER.size:])
+    index = pickle.loads(buffer[position:-TRAILER.size])
+    if index['sage_version'] != SAGE_VERSION:
+        warnings.warn("%s was saved with Sage %s" % (filename, index['sage_version']))
+    return SavedHistory([SavedPage(*page) for page in index['pages']], buffer)
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+r"""
+Tables of properties of many objects
+
+Exploring a list of objects opens a table, with one row per object and one
+column per property detected for them in ``properties.yml``, instead of one
+explorer per object. Rows are computed in batches by a pool of worker
+processes, which get the pickled objects, and shown as they arrive; only a
+window of rows is rendered at a time. The table can be exported to CSV, or
+to a NumPy structured array.
+
+EXAMPLES::
+
+    sage: from sage_explorer import explore
+    sage: t = explore(list(Partitions(30)))
+    sage: t.wait()
+    sage: t.to_csv('partitions30.csv')
+    'partitions30.csv'
+"""
+import csv, numbers, pickle, threading, time, multiprocessing, numpy
+from collections import OrderedDict
+from ipywidgets import VBox, HTML, Label, IntSlider
+try:
+    from html import escape
+except ImportError: # Python 2
+    from cgi import escape
+from .sage_explorer import SageExplorer, get_explored_members, property_labels, property_values, \
+    truncate, ELEMENT_MAX_CHARS
+
+BATCH_SIZE = 32 # Objects per task handed to a worker process
+REFRESH_DELAY = 0.5 # Minimal time between two renderings of the table while computing, in seconds
+
+def cell_value(value):
+    r"""
+    Return the content of a table cell for property value `value`:
+    booleans, integers and floating point numbers as such, other values
+    as strings.
+
+    TESTS::
+        sage: from sage_explorer.table import cell_value
+        sage: cell_value(True), cell_value(ZZ(3)), cell_value(RR(1/2)), cell_value(1/2), cell_value(None)
+        (True, 3, 0.5, '1/2', None)
+    """
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, numbers.Real) and not isinstance(value, numbers.Rational):
+        return float(value)
+    return str(value)
+
+def object_row(obj):
+    r"""
+    Compute the row of object `obj`: a list of triples
+    (property name, property label, cell content).
+
+    TESTS::
+        sage: from sage_explorer.table import object_row
+        sage: [(name, cell) for name, label, cell in object_row(Partition([3,3,2,1])) if name == 'conjugate']
+        [('conjugate', '[4, 3, 2]')]
+    """
+    members = get_explored_members(obj)
+    labels = property_labels(obj, members)
+    properties = [m for m in members if m.name in labels]
+    values = property_values(obj, properties)
+    return [(m.name, labels[m.name], cell_value(values[m.name])) for m in properties]
+
+def row_result(i, obj):
+    r"""
+    Compute the row of object `obj`, at index `i`.
+
+    OUTPUT: a tuple (index, row or None, error message or None)
+    """
+    try:
+        return i, object_row(obj), None
+    except Exception as e:
+        return i, None, "%s: %s" % (e.__class__.__name__, e)
+
+def row_batch(batch):
+    r"""
+    Compute the rows of a `batch` of pairs (index, pickled object), in a worker process.
+
+    OUTPUT: a list of tuples, see :func:`row_result`
+    """
+    results = []
+    for i, data in batch:
+        try:
+            obj = pickle.loads(data)
+        except Exception as e:
+            results.append((i, None, "%s: %s" % (e.__class__.__name__, e)))
+            continue
+        results.append(row_result(i, obj))
+    return results
+
+def init_worker():
+    r"""
+    Load Sage once in each worker process.
+    """
+    from . import sage_explorer
+
+def column_array(cells):
+    r"""
+    Return a NumPy array of table `cells` (see :func:`cell_value`), None
+    being a missing cell: booleans or integers if there are neither other
+    values nor missing cells, floating point numbers if the cells are
+    numbers, missing ones being NaN, else strings, missing ones being empty.
+
+    TESTS::
+        sage: from sage_explorer.table import column_array
+        sage: column_array([int(1), int(2)]).dtype, column_array([int(1), None]).dtype
+        (dtype('int64'), dtype('float64'))
+        sage: column_array([True, float(2.5)]).dtype, column_array([int(1), int(2**70)]).dtype
+        (dtype('<U4'), dtype('float64'))
+    """
+    present = [c for c in cells if c is not None]
+    complete = len(present) == len(cells)
+    if present and complete and all(isinstance(c, bool) for c in present):
+        return numpy.array(cells, dtype=bool)
+    if present and all(isinstance(c, (int, float)) and not isinstance(c, bool) for c in present):
+        if complete and all(isinstance(c, int) for c in present):
+            try:
+                return numpy.array(cells, dtype=numpy.int64)
+            except OverflowError:
+                pass
+        return numpy.array([numpy.nan if c is None else float(c) for c in cells], dtype=float)
+    return numpy.array(['' if c is None else str(c) for c in cells], dtype=str)
+
+class TableExplorer(VBox):
+    r"""
+    A table of the properties of `objects`, one row per object, showing
+    `rows` rows at a time.
+
+    Rows are computed in the background, in `processes` worker processes
+    (by default, one per core). With 0, or for objects that cannot be
+    pickled, they are computed in the kernel when the table is created:
+    in the main thread, where the alarms of `when` predicates work.
+
+    TESTS::
+        sage: from sage_explorer.table import TableExplorer
+        sage: t = TableExplorer(list(Partitions(6)), rows=5)
+        sage: t.wait()
+        sage: t.info.value, t.table.value.count('<tr>')
+        ('11 objects: rows 1 to 5', 6)
+        sage: t.slider.value = 9
+        sage: t.info.value
+        '11 objects: rows 10 to 11'
+        sage: a = TableExplorer([SymmetricGroup(n) for n in range(1, 5)], processes=0).to_numpy()
+        sage: a['cardinality']
+        array([ 1,  2,  6, 24])
+    """
+    def __init__(self, objects, processes=None, rows=20):
+        super(TableExplorer, self).__init__()
+        self.objects = list(objects)
+        self.processes = multiprocessing.cpu_count() if processes is None else processes
+        self.rows = max(1, min(rows, len(self.objects)))
+        self.cells = [None] * len(self.objects) # Cells of each row by property name, once computed
+        self.errors = {} # Error messages by row
+        self.columns = OrderedDict() # Property labels by name, in order of appearance
+        self.computed = 0
+        self.lock = threading.Lock()
+        self.closed = False
+        self.rendered = 0
+        self.table = HTML()
+        self.info = Label()
+        self.slider = IntSlider(min=0, max=max(0, len(self.objects) - self.rows), description='Row',
+                                readout=False, continuous_update=False)
+        self.slider.observe(lambda change: self.update(), names='value')
+        self.children = [self.table, self.info, self.slider]
+        self.update()
+        batches, local = self.batches() if self.processes else ([], range(len(self.objects)))
+        for i in local:
+            self.add([row_result(i, self.objects[i])])
+        self.update()
+        self.thread = threading.Thread(target=self.work, args=(batches,))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def batches(self):
+        r"""
+        Return the list of batches of pairs (index, pickled object) for
+        the pool, and the list of indexes of objects that cannot be pickled.
+        """
+        batches, batch, local = [], [], []
+        for i, obj in enumerate(self.objects):
+            try:
+                batch.append((i, pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)))
+            except Exception:
+                local.append(i)
+                continue
+            if len(batch) == BATCH_SIZE:
+                batches.append(batch)
+                batch = []
+        if batch:
+            batches.append(batch)
+        return batches, local
+
+    def work(self, batches):
+        r"""
+        Compute the rows of `batches` (see :meth:`batches`) in the pool,
+        in a background thread.
+        """
+        if not batches:
+            return
+        pool = multiprocessing.Pool(self.processes, initializer=init_worker)
+        try:
+            results = pool.imap_unordered(row_batch, batches)
+            while not self.closed:
+                try:
+                    self.add(results.next(timeout=REFRESH_DELAY))
+                except multiprocessing.TimeoutError:
+                    continue
+                except StopIteration:
+                    break
+        finally:
+            pool.terminate()
+        self.update()
+
+    def add(self, results):
+        r"""
+        Store computed rows `results` (see :func:`row_result`), and render
+        the table if it has not been for a while.
+        """
+        with self.lock:
+            for i, row, error in results:
+                if row is None:
+                    self.errors[i] = error
+                    row = []
+                for name, label, cell in row:
+                    if not name in self.columns:
+                        self.columns[name] = label
+                self.cells[i] = dict((name, cell) for name, label, cell in row)
+                self.computed += 1
+        if time.time() - self.rendered > REFRESH_DELAY:
+            self.update()
+
+    def update(self):
+        r"""
+        Render the window of rows at the position of the slider.
+        """
+        i0 = self.slider.value
+        i1 = min(i0 + self.rows, len(self.objects))
+        with self.lock:
+            columns = list(self.columns.items())
+            cells = self.cells[i0:i1]
+            errors = dict((i, self.errors[i]) for i in range(i0, i1) if i in self.errors)
+            computed = self.computed
+        lines = ['<tr><th>#</th><th>Object</th>%s</tr>' % ''.join('<th>%s</th>' % escape(label) for name, label in columns)]
+        for i, row in zip(range(i0, i1), cells):
+            if i in errors:
+                tds = '<td class="resultinfo" colspan="%d">%s</td>' % (max(1, len(columns)), escape(errors[i]))
+            elif row is None:
+                tds = '<td class="resultinfo" colspan="%d">...</td>' % max(1, len(columns))
+            else:
+                tds = ''.join('<td>%s</td>' % escape(truncate('' if row.get(name) is None else str(row[name]), ELEMENT_MAX_CHARS))
+                              for name, label in columns)
+            lines.append('<tr><td>%d</td><td>%s</td>%s</tr>' % (i + 1, escape(truncate(repr(self.objects[i]), ELEMENT_MAX_CHARS)), tds))
+        self.table.value = '<table style="border-collapse: collapse; font-family: monospace" ' \
+            'border="1" cellpadding="3">%s</table>' % ''.join(lines)
+        info = '%d objects: rows %d to %d' % (len(self.objects), i0 + 1, i1)
+        if computed < len(self.objects):
+            info += ', %d computed' % computed
+        self.info.value = info
+        self.rendered = time.time()
+
+    def wait(self, timeout=None):
+        r"""
+        Wait for all rows to be computed.
+        """
+        self.thread.join(timeout)
+
+    def close(self):
+        r"""
+        Stop computing rows, and close the widget.
+        """
+        self.closed = True
+        super(TableExplorer, self).close()
+
+    def explore_row(self, i):
+        r"""
+        Return an explorer of the object of row `i`, counted from 0.
+        """
+        return SageExplorer(self.objects[i])
+
+    def to_csv(self, filename):
+        r"""
+        Write the table into CSV file `filename`, once computed,
+        with one column per property name, and return `filename`.
+
+        TESTS::
+            sage: from sage_explorer.table import TableExplorer
+            sage: filename = tmp_filename(ext='.csv')
+            sage: _ = TableExplorer([SymmetricGroup(n) for n in range(1, 4)]).to_csv(filename)
+            sage: lines = open(filename).read().splitlines()
+            sage: lines[0].split(',')[:1], len(lines)
+            (['object'], 4)
+        """
+        self.wait()
+        names = list(self.columns)
+        with open(filename, 'w') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(['object'] + names)
+            for obj, row in zip(self.objects, self.cells):
+                row = row or {}
+                writer.writerow([str(obj)] + ['' if row.get(name) is None else row[name] for name in names])
+        return filename
+
+    def to_numpy(self):
+        r"""
+        Return the table, once computed, as a NumPy structured array with
+        field ``object`` (the objects as strings) and one field per property
+        name (see :func:`column_array`).
+        """
+        self.wait()
+        arrays = [('object', numpy.array([str(obj) for obj in self.objects], dtype=str))]
+        for name in self.columns:
+            arrays.append((name, column_array([(row or {}).get(name) for row in self.cells])))
+        result = numpy.empty(len(self.objects), dtype=[(name, a.dtype) for name, a in arrays])
+        for name, a in arrays:
+            result[name] = a
+        return result
@@ -42,5 +42,7 @@ setup(
     keywords = "SageMath widget explorer jupyter notebook",
     packages = ['sage_explorer'],
     cmdclass = {'test': SageTest}, # adding a special setup command for tests
+    entry_points = {'console_scripts': ['sage-explorer-precompute = sage_explorer.precompute:main',
+                                        'sage-explorer-introspect = sage_explorer.introspection_db:main']},
     install_requires = ['ipywidgets', 'pyyaml', 'sage-combinat-widgets'] # 'recursive-monkey-patch'
 )